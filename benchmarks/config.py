@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import datetime
+
+from ledger_importer import Config
+from ledger_importer import Posting
+from ledger_importer import parsing
+
+
+class BenchmarkConfig(Config):
+    """
+    Config of the statements written by generate_statements.
+    """
+
+    def parse_date(self, fields: tuple) -> datetime.datetime:
+        return parsing.parse_date(fields[0], "%Y-%m-%d")
+
+    def parse_payee(self, fields: tuple) -> str:
+        return fields[1]
+
+    def parse_postings(self, fields: tuple) -> list[Posting]:
+        amount = parsing.parse_amount(fields[2], commodity="€", decimal_separator=".")
+        account = "Income" if amount > 0 else "Expenses"
+        return [Posting(account=fields[3], amount=amount), Posting(account=account, amount=amount.reverse())]
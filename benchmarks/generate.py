@@ -0,0 +1,102 @@
+"""
+Deterministic generator of bank statements and journals for the benchmarks.
+"""
+from __future__ import annotations
+
+import csv
+import datetime
+import pathlib
+import random
+from decimal import Decimal
+
+ACCOUNTS = ["Assets:Checking", "Assets:Savings", "Liabilities:CreditCard", "Assets:Broker"]
+PAYEES = ["SUPERMARKET", "RESTAURANT", "SALARY", "RENT", "NETFLIX.COM", "PHARMACY", "TRAIN TICKET", "BOOKSHOP"]
+START = datetime.date(2021, 1, 1)
+
+
+def generate_statements(
+    directory: pathlib.Path,
+    rows: int,
+    accounts: int = 3,
+    transfer_ratio: float = 0.1,
+    days: int = 365,
+    seed: int = 0,
+) -> list[pathlib.Path]:
+    """
+    Write one statement per account with rows rows in total, sorted by date.
+
+    A share transfer_ratio of the rows are transfers between two accounts,
+    written as a debit in one statement and a credit in the other one.
+    Columns are: date (YYYY-MM-DD), payee, amount, account.
+    """
+    rng = random.Random(seed)
+    statements: list[list[tuple[str, str, str, str]]] = [[] for _ in range(accounts)]
+
+    generated = 0
+    while generated < rows:
+        date = (START + datetime.timedelta(days=rng.randrange(days))).isoformat()
+        account = rng.randrange(accounts)
+        quantity = Decimal(rng.randrange(1, 200_000)) / 100
+
+        if accounts > 1 and rng.random() < transfer_ratio and generated + 2 <= rows:
+            target = (account + rng.randrange(1, accounts)) % accounts
+            statements[account].append((date, f"TRANSFER {generated}", str(-quantity), ACCOUNTS[account]))
+            statements[target].append((date, f"TRANSFER {generated}", str(quantity), ACCOUNTS[target]))
+            generated += 2
+        else:
+            payee = f"CARD {rng.randrange(1, 28):02}/{rng.randrange(1, 13):02} {rng.choice(PAYEES)}"
+            statements[account].append((date, payee, str(-quantity), ACCOUNTS[account]))
+            generated += 1
+
+    paths = []
+    directory.mkdir(parents=True, exist_ok=True)
+    for index, statement in enumerate(statements):
+        path = directory / f"statement-{index}.csv"
+        with path.open("w", newline="") as statement_file:
+            writer = csv.writer(statement_file)
+            writer.writerow(("date", "payee", "amount", "account"))
+            writer.writerows(sorted(statement))
+        paths.append(path)
+    return paths
+
+
+def generate_journal(
+    directory: pathlib.Path,
+    accounts: int,
+    transactions: int,
+    files: int = 1,
+    seed: int = 0,
+    sorted_dates: bool = False,
+) -> pathlib.Path:
+    """
+    Write a journal declaring accounts accounts and holding transactions transactions.
+
+    The transactions are split in files files included by the main journal.
+    With sorted_dates, the transactions of each file are spread over the year in date order.
+    """
+    rng = random.Random(seed)
+    names = [f"Expenses:Client{index // 100}:Project{index % 100}" for index in range(accounts)]
+    directory.mkdir(parents=True, exist_ok=True)
+
+    journal_path = directory / "journal.ledger"
+    with journal_path.open("w") as journal_file:
+        for name in names:
+            journal_file.write(f"account {name}\n")
+        for index in range(files):
+            journal_file.write(f"include transactions-{index}.ledger\n")
+
+    for index in range(files):
+        with (directory / f"transactions-{index}.ledger").open("w") as transactions_file:
+            for row in range(transactions // files):
+                if sorted_dates:
+                    date = START + datetime.timedelta(days=row * 365 // (transactions // files))
+                else:
+                    date = START + datetime.timedelta(days=rng.randrange(365))
+                quantity = Decimal(rng.randrange(1, 200_000)) / 100
+                transactions_file.write(
+                    f"{date:%Y/%m/%d}    {rng.choice(PAYEES)}\n"
+                    f"    Assets:Checking    {-quantity} €\n"
+                    f"    {rng.choice(names)}    {quantity} €\n\n"
+                )
+
+    return journal_path
@@ -0,0 +1,199 @@
+"""
+Benchmarks of the import pipeline.
+
+    python -m benchmarks.run --sizes 10000 100000 1000000
+    python -m benchmarks.run --save       # store the results as the new baseline
+    python -m benchmarks.run --compare    # fail when slower than the baseline
+
+The startup benchmark ignores --sizes: it measures STARTUP_RUNS invocations of the cli.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+
+from benchmarks.config import BenchmarkConfig
+from benchmarks.generate import generate_journal
+from benchmarks.generate import generate_statements
+from ledger_importer.journal import load_accounts
+from ledger_importer.transactions_handler import TransactionsHandler
+from ledger_importer.writer import LedgerWriter
+from ledger_importer.writer import insert_into_journal
+
+BASELINE_PATH = pathlib.Path(__file__).with_name("baseline.json")
+SIZES = [10_000, 100_000, 1_000_000]
+STARTUP_RUNS = 20
+
+# A benchmark generates its data in a directory and returns a function preparing each measured run
+Benchmark = Callable[[pathlib.Path, int], Callable[[], Callable[[], object]]]
+BENCHMARKS: dict[str, Benchmark] = {}
+# Sizes of the benchmarks that don't depend on --sizes, and what their size counts
+FIXED_SIZES: dict[str, tuple[list[int], str]] = {}
+
+
+def benchmark(name: str, sizes: Optional[list[int]] = None, unit: str = "rows") -> Callable[[Benchmark], Benchmark]:
+    def register(function: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = function
+        if sizes is not None:
+            FIXED_SIZES[name] = (sizes, unit)
+        return function
+
+    return register
+
+
+@benchmark("parse_transactions")
+def parse_transactions(directory: pathlib.Path, size: int) -> Callable[[], Callable[[], object]]:
+    statement_paths = generate_statements(directory, size)
+    handler = TransactionsHandler(BenchmarkConfig())
+    return lambda: lambda: handler.parse_statements(statement_paths)
+
+
+@benchmark("merge_transactions")
+def merge_transactions(directory: pathlib.Path, size: int) -> Callable[[], Callable[[], object]]:
+    statement_paths = generate_statements(directory, size, transfer_ratio=0.3)
+    handler = TransactionsHandler(BenchmarkConfig())
+
+    def prepare() -> Callable[[], object]:
+        # merge_transactions updates the transactions, they are parsed again for each run
+        transactions = handler.parse_statements(statement_paths)
+        return lambda: handler.merge_transactions(transactions)
+
+    return prepare
+
+
+@benchmark("parse_accounts")
+def parse_accounts(directory: pathlib.Path, size: int) -> Callable[[], Callable[[], object]]:
+    journal_path = generate_journal(directory, accounts=size // 10, transactions=size, files=10)
+
+    def prepare() -> Callable[[], object]:
+        # Each run uses an empty cache
+        cache_directory = pathlib.Path(tempfile.mkdtemp(dir=directory))
+        return lambda: load_accounts(journal_path, cache_directory=cache_directory)
+
+    return prepare
+
+
+@benchmark("to_ledger")
+def to_ledger(directory: pathlib.Path, size: int) -> Callable[[], Callable[[], object]]:
+    transactions = TransactionsHandler(BenchmarkConfig()).parse_statements(generate_statements(directory, size))
+    return lambda: lambda: LedgerWriter(io.StringIO()).write_all(transactions)
+
+
+@benchmark("insert_transactions")
+def insert_transactions(directory: pathlib.Path, size: int) -> Callable[[], Callable[[], object]]:
+    # A tenth of the size is inserted into a journal of size transactions, all over the journal
+    generate_journal(directory, accounts=100, transactions=size, sorted_dates=True)
+    transactions = TransactionsHandler(BenchmarkConfig()).parse_statements(
+        generate_statements(directory / "statements", size // 10)
+    )
+
+    def prepare() -> Callable[[], object]:
+        # Each run inserts into a copy of the generated journal
+        journal_path = pathlib.Path(tempfile.mkdtemp(dir=directory)) / "journal.ledger"
+        shutil.copyfile(directory / "transactions-0.ledger", journal_path)
+
+        def insert() -> None:
+            with insert_into_journal(journal_path) as writer:
+                writer.write_all(transactions)
+
+        return insert
+
+    return prepare
+
+
+@benchmark("startup", sizes=[STARTUP_RUNS], unit="runs")
+def startup(directory: pathlib.Path, size: int) -> Callable[[], Callable[[], object]]:
+    commands = [["--version"], ["init"], ["import", "--help"]]
+
+    def run_cli() -> None:
+        for i in range(size):
+            subprocess.run(
+                [sys.executable, "-m", "ledger_importer", *commands[i % len(commands)]],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+
+    return lambda: run_cli
+
+
+def measure(prepare: Callable[[], Callable[[], object]]) -> dict[str, float]:
+    function = prepare()
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+
+    # Tracing memory slows the run down, it's measured on a second run
+    function = prepare()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": round(seconds, 4), "peak_mb": round(peak / 1024 / 1024, 2)}
+
+
+def run(names: list[str], sizes: list[int]) -> Iterator[tuple[str, int, dict[str, float]]]:
+    for name in names:
+        for size in FIXED_SIZES.get(name, (sizes, ""))[0]:
+            with tempfile.TemporaryDirectory() as directory:
+                yield name, size, measure(BENCHMARKS[name](pathlib.Path(directory), size))
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, sizes in results.items():
+        for size, result in sizes.items():
+            reference = baseline.get(name, {}).get(size)
+            if not reference:
+                continue
+            for metric in ("seconds", "peak_mb"):
+                if reference[metric] and result[metric] > reference[metric] * threshold:
+                    regressions.append(
+                        f"{name} ({size} rows): {metric} {result[metric]} > {reference[metric]} * {threshold}"
+                    )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--benchmarks", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--save", action="store_true", help="Store the results as the baseline.")
+    parser.add_argument("--compare", action="store_true", help="Fail when slower than the baseline.")
+    parser.add_argument("--threshold", type=float, default=1.3, help="Tolerated ratio to the baseline.")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for name, size, result in run(args.benchmarks, args.sizes):
+        unit = FIXED_SIZES.get(name, ([], "rows"))[1]
+        print(f"{name:<20} {size:>9} {unit:<4} {result['seconds']:>9.3f}s {result['peak_mb']:>9.1f}MB", flush=True)
+        results.setdefault(name, {})[str(size)] = result
+
+    if args.save:
+        baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+        for name, sizes in results.items():
+            baseline.setdefault(name, {}).update(sizes)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+    if args.compare:
+        regressions = compare(results, json.loads(BASELINE_PATH.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,38 @@
 from __future__ import annotations
 
-from ledger_importer.config import Config
-from ledger_importer.transaction import Amount
-from ledger_importer.transaction import Posting
-from ledger_importer.transaction import Transaction
+import importlib
+from typing import TYPE_CHECKING
+from typing import Any
 
-__all__ = ("Config", "Amount", "Posting", "Transaction")
+if TYPE_CHECKING:
+    from ledger_importer.config import Config
+    from ledger_importer.config import SchemaConfig
+    from ledger_importer.rules import Rule
+    from ledger_importer.schema import ColumnSchema
+    from ledger_importer.transaction import Amount
+    from ledger_importer.transaction import Posting
+    from ledger_importer.transaction import Transaction
+
+__all__ = ("Config", "SchemaConfig", "ColumnSchema", "Rule", "Amount", "Posting", "Transaction")
 
 __version__ = "0.5.2"
+
+# Modules of the exported names, imported on first access so that the cli starts fast
+_EXPORTS = {
+    "Config": "ledger_importer.config",
+    "SchemaConfig": "ledger_importer.config",
+    "ColumnSchema": "ledger_importer.schema",
+    "Rule": "ledger_importer.rules",
+    "Amount": "ledger_importer.transaction",
+    "Posting": "ledger_importer.transaction",
+    "Transaction": "ledger_importer.transaction",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
-import csv
-import importlib
 import os
 import pathlib
-import re
-import readline
 import sys
+from contextlib import ExitStack
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+from typing import Iterable
+from typing import List
 from typing import Optional
 
 import typer
 
 from ledger_importer import __version__
-from ledger_importer.transactions_handler import TransactionsHandler
+from ledger_importer.match import Match
+
+# The import stack is imported by the import command only, so that the cli starts fast
+if TYPE_CHECKING:
+    from ledger_importer.config import Config
+    from ledger_importer.manifest import Manifest
+    from ledger_importer.stats import Stats
+    from ledger_importer.transaction import Transaction
 
 app = typer.Typer()
 
@@ -20,10 +28,9 @@ SAMPLE_CONFIG = """#!/usr/bin/env python
 from __future__ import annotations
 
 import datetime
-import re
-from decimal import Decimal
+from typing import Optional
 
-from ledger_importer import Config, Posting, Amount
+from ledger_importer import Config, Posting, parsing
 
 # Custom ledger importer configuration
 class LedgerImporterConfig(Config):
@@ -34,17 +41,20 @@ class LedgerImporterConfig(Config):
     # Define the csv delimiter
     csv_delimiter: str = ","
 
+    # Define the csv encoding, it's detected when None
+    csv_encoding: Optional[str] = None
+
     # The argument `fields` given in all parse_* methods contains a whole csv row in a tuple
     # Each element of the tuple is a string representation of the column
 
     def parse_date(self, fields: tuple) -> datetime.datetime:
-        return datetime.datetime.strptime(fields[0], "%m-%d-%Y")
+        return parsing.parse_date(fields[0], "%m-%d-%Y")
 
     def parse_payee(self, fields: tuple) -> str:
         return fields[2]
 
     def parse_postings(self, fields: tuple) -> list[Posting]:
-        amount = Amount(quantity=Decimal(re.sub("[€ ]", "", fields[3]).replace(",", ".")), commodity="€")
+        amount = parsing.parse_amount(fields[3], commodity="€", decimal_separator=",")
         if amount > 0:
             account = "Income"
         else:
@@ -65,87 +75,413 @@ def init():
     print(SAMPLE_CONFIG)
 
 
-ACCOUNT_LINE = r"^account ([A-z_ :]*[A-z])( +;?.*)?"
-
-
-def parse_accounts(data: str) -> list[str]:
-    accounts: list[str] = []
-
-    for line in data.split("\n"):
-        m = re.match(ACCOUNT_LINE, line)
-        if not m:
-            continue
-        accounts.append(m.groups()[0])
-
-    return accounts
-
-
-class AccountCompleter:
-    def __init__(self, accounts: list[str]) -> None:
-        self.accounts = accounts
-
-    def complete(self, text: str, state: int) -> str | None:
-        # on first trigger, build possible matches
-        if state == 0:
-            if not text:
-                self.matches = self.accounts[:]
-            else:
-                self.matches = [s for s in self.accounts if s and s.startswith(text)]
-
-        try:
-            return self.matches[state]
-        except IndexError:
-            pass
-
-        return None
-
-
 @app.command("import")
 def import_(
-    statement_path: pathlib.Path = typer.Option(..., help="Path to the bank statement to import."),
+    statement_paths: List[pathlib.Path] = typer.Option(
+        ..., "--statement-path", help="Path to the bank statement to import, can be repeated."
+    ),
     config_path: str = typer.Option(..., help="Python path to the configuration file."),
     journal_path: Optional[pathlib.Path] = typer.Option(
         None, help="Path a ledger journal to write & learn accounts from."
     ),
     quiet: bool = typer.Option(False, help="Don't ask questions and guess all the accounts automatically."),
+    stream: bool = typer.Option(False, help="Import the statement as a stream, in bounded memory."),
+    workers: int = typer.Option(1, min=1, help="Number of processes used to parse the statement."),
+    skip_imported: bool = typer.Option(False, help="Skip the transactions already in the journal."),
+    checkpoint: bool = typer.Option(False, help="Only import the rows added to the statements since the last import."),
+    guess_accounts: bool = typer.Option(
+        False, help="Guess the unknown target accounts from the payees already in the journal."
+    ),
+    completion_match: Match = typer.Option(Match.prefix, help="How typed text is matched against accounts."),
+    group: bool = typer.Option(False, help="Confirm the transactions of a same payee and account at once."),
+    append: bool = typer.Option(False, help="Append the transactions to the journal instead of stdout."),
+    insert: bool = typer.Option(False, help="Insert the transactions into the journal at their date."),
+    align_column: int = typer.Option(0, min=0, help="Align amounts to end at this column, 0 to disable."),
+    stats: bool = typer.Option(False, help="Report the time spent in each stage and Config hook on stderr."),
+    stats_path: Optional[pathlib.Path] = typer.Option(None, help="Write the stats report to this JSON file."),
+    profile: Optional[pathlib.Path] = typer.Option(None, help="Dump a cProfile of the import to this file."),
+):
+    """
+    Import bank statements.
+    """
+    _check_output(journal_path, append, insert)
+    if group and stream:
+        raise typer.BadParameter("--group needs all the transactions, it can't be used with --stream.")
+
+    import_stats: Optional[Stats] = None
+    if stats or stats_path:
+        from ledger_importer.stats import Stats
+
+        import_stats = Stats()
+
+    profiler = None
+    if profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        _import(
+            statement_paths,
+            config_path,
+            journal_path,
+            quiet=quiet,
+            stream=stream,
+            workers=workers,
+            skip_imported=skip_imported,
+            checkpoint=checkpoint,
+            guess_accounts=guess_accounts,
+            completion_match=completion_match,
+            group=group,
+            append=append,
+            insert=insert,
+            align_column=align_column,
+            stats=import_stats,
+        )
+    finally:
+        if profiler and profile:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        if import_stats and stats:
+            import_stats.write_text(sys.stderr)
+        if import_stats and stats_path:
+            with stats_path.open("w") as stats_file:
+                import_stats.write_json(stats_file)
+
+
+def _check_output(journal_path: Optional[pathlib.Path], append: bool, insert: bool) -> None:
+    if append and not journal_path:
+        raise typer.BadParameter("--append needs a --journal-path.")
+    if insert and not journal_path:
+        raise typer.BadParameter("--insert needs a --journal-path.")
+    if insert and append:
+        raise typer.BadParameter("--insert and --append can't be used together.")
+
+
+def load_config(config_path: str) -> Config:
+    """
+    Instantiate the class of a "path/to/config.py::ClassName" config path.
+    """
+    from ledger_importer.config import load_config_class
+
+    file_path, _, class_name = config_path.rpartition("::")
+    path = pathlib.Path(file_path)
+    if path.suffix != ".py" and path.name:
+        path = path.with_name(f"{path.name}.py")
+
+    if not class_name or not path.is_file():
+        raise typer.BadParameter(f"Can't load a config from {config_path}.", param_hint="--config-path")
+    return load_config_class(path, class_name)()
+
+
+def _import(
+    statement_paths: List[pathlib.Path],
+    config_path: str,
+    journal_path: Optional[pathlib.Path],
+    quiet: bool,
+    stream: bool,
+    workers: int,
+    skip_imported: bool,
+    checkpoint: bool,
+    guess_accounts: bool,
+    completion_match: Match,
+    group: bool,
+    append: bool,
+    insert: bool,
+    align_column: int,
+    stats: Optional[Stats],
+) -> None:
+    from ledger_importer.checkpoint import CheckpointStore
+    from ledger_importer.fingerprint import FingerprintIndex
+    from ledger_importer.guesser import AccountGuesser
+    from ledger_importer.transactions_handler import TransactionsHandler
+
+    def stage(name: str):
+        return stats.stage(name) if stats else nullcontext()
+
+    with stage("load_config"):
+        config = load_config(config_path)
+
+    if not quiet:
+        # Get accounts list, only used to complete the answers
+        accounts: list[str] = []
+        if journal_path:
+            from ledger_importer.journal import load_accounts
+
+            with stage("load_accounts"):
+                accounts = load_accounts(journal_path)
+
+        _setup_completion(accounts, completion_match)
+
+    # Parse transactions, merge them and confirm them
+    with stage("load_indexes"):
+        known_transactions: Optional[FingerprintIndex] = None
+        if journal_path and skip_imported:
+            known_transactions = FingerprintIndex.load(journal_path)
+        handler = TransactionsHandler(
+            config,
+            workers=workers,
+            known_transactions=known_transactions,
+            checkpoints=CheckpointStore(config) if checkpoint else None,
+            guesser=AccountGuesser.load(journal_path) if journal_path and guess_accounts else None,
+            stats=stats,
+        )
+
+    with ExitStack() as stack:
+        transactions: Iterable[Transaction]
+        if stream:
+            # Stages are interleaved when streaming, only the whole pipeline is timed
+            stack.enter_context(stage("pipeline"))
+            transactions = handler.stream_statements(statement_paths)
+            if not quiet:
+                transactions = handler.iter_confirm_transactions(transactions)
+        else:
+            with stage("parse"):
+                transactions = handler.parse_statements(statement_paths)
+            with stage("merge"):
+                transactions = handler.merge_transactions(transactions)
+            if not quiet:
+                with stage("confirm"):
+                    if group:
+                        transactions = handler.confirm_grouped_transactions(transactions)
+                    else:
+                        transactions = handler.confirm_transactions(transactions)
+            stack.enter_context(stage("write"))
+
+        written = _write_transactions(transactions, journal_path, append, insert, align_column)
+        if stats:
+            stats.count("transactions_written", written)
+
+    if handler.checkpoints and not handler.interrupted:
+        handler.checkpoints.save()
+
+
+@app.command("import-batch")
+def import_batch(
+    manifest_path: pathlib.Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="Json manifest of the statements to import and their config."
+    ),
+    journal_path: Optional[pathlib.Path] = typer.Option(
+        None, help="Path a ledger journal to write & learn accounts from."
+    ),
+    quiet: bool = typer.Option(False, help="Don't ask questions and guess all the accounts automatically."),
+    workers: Optional[int] = typer.Option(
+        None, min=1, help="Number of processes used to parse the statements, one per cpu by default."
+    ),
+    skip_imported: bool = typer.Option(False, help="Skip the transactions already in the journal."),
+    guess_accounts: bool = typer.Option(
+        False, help="Guess the unknown target accounts from the payees already in the journal."
+    ),
+    completion_match: Match = typer.Option(Match.prefix, help="How typed text is matched against accounts."),
+    group: bool = typer.Option(False, help="Confirm the transactions of a same payee and account at once."),
+    append: bool = typer.Option(False, help="Append the transactions to the journal instead of stdout."),
+    insert: bool = typer.Option(False, help="Insert the transactions into the journal at their date."),
+    align_column: int = typer.Option(0, min=0, help="Align amounts to end at this column, 0 to disable."),
 ):
     """
-    Import a bank statement.
+    Import the statements listed in a manifest.
+    """
+    _check_output(journal_path, append, insert)
+
+    from ledger_importer.manifest import load_manifest
+
+    try:
+        manifest = load_manifest(manifest_path)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="MANIFEST_PATH")
+
+    _import_batch(
+        manifest,
+        journal_path,
+        quiet=quiet,
+        workers=workers or os.cpu_count() or 1,
+        skip_imported=skip_imported,
+        guess_accounts=guess_accounts,
+        completion_match=completion_match,
+        group=group,
+        append=append,
+        insert=insert,
+        align_column=align_column,
+    )
+
+
+def _import_batch(
+    manifest: Manifest,
+    journal_path: Optional[pathlib.Path],
+    *,
+    quiet: bool,
+    workers: int,
+    skip_imported: bool,
+    guess_accounts: bool,
+    completion_match: Match,
+    group: bool,
+    append: bool,
+    insert: bool,
+    align_column: int,
+) -> None:
+    import heapq
+
+    from ledger_importer.fingerprint import FingerprintIndex
+    from ledger_importer.guesser import AccountGuesser
+    from ledger_importer.parallel import parse_config_statements
+    from ledger_importer.sorting import transaction_date
+    from ledger_importer.transactions_handler import TransactionsHandler
+
+    configs = {config_path: load_config(config_path) for config_path in manifest.config_paths}
+    match_config_path = manifest.match_config_path or manifest.entries[0].config_path
+    match_config = configs.get(match_config_path) or load_config(match_config_path)
+
+    if not quiet:
+        accounts: list[str] = []
+        if journal_path:
+            from ledger_importer.journal import load_accounts
+
+            accounts = load_accounts(journal_path)
+        _setup_completion(accounts, completion_match)
+
+    known_transactions: Optional[FingerprintIndex] = None
+    if journal_path and skip_imported:
+        known_transactions = FingerprintIndex.load(journal_path)
+    # Transfers between the statements are matched once, over all their transactions
+    handler = TransactionsHandler(
+        match_config,
+        known_transactions=known_transactions,
+        guesser=AccountGuesser.load(journal_path) if journal_path and guess_accounts else None,
+    )
+
+    statements_transactions = parse_config_statements(
+        [(configs[entry.config_path], entry.statement_path) for entry in manifest.entries], workers
+    )
+    transactions = handler.merge_transactions(
+        list(
+            heapq.merge(
+                *(handler.guess_accounts(statement_transactions) for statement_transactions in statements_transactions),
+                key=transaction_date,
+            )
+        )
+    )
+    if not quiet:
+        if group:
+            transactions = handler.confirm_grouped_transactions(transactions)
+        else:
+            transactions = handler.confirm_transactions(transactions)
+
+    _write_transactions(transactions, journal_path, append, insert, align_column)
+
+
+def _setup_completion(accounts: list[str], completion_match: Match) -> None:
+    """
+    Complete the answers of the confirmation prompts with the accounts.
     """
-    # Load config from python path
-    config_path_without_class = config_path.split("::")[:-1][0]
-    module_path = "/".join(config_path_without_class.split("/")[:-1])
-    module = config_path_without_class.split("/")[-1].split(".py")[0]
-    klass = config_path.split("::")[-1]
-    sys.path.append(os.path.abspath(module_path or "."))
-    config = getattr(importlib.import_module(module), klass)()
+    import readline
 
-    # Get accounts list
-    accounts: list[str] = []
-    if journal_path:
-        with journal_path.open() as journal_file:
-            accounts = parse_accounts(journal_file.read())
+    from ledger_importer.completion import AccountCompleter
 
-    # Setup account completion
-    completer = AccountCompleter(accounts)
+    completer = AccountCompleter(accounts, by_segment=completion_match != Match.subsequence, match=completion_match)
     readline.set_completer(completer.complete)
     readline.parse_and_bind("tab: complete")
     readline.set_completer_delims(" \t\n;")
 
-    # Parse transactions, merge them and confirm them
-    handler = TransactionsHandler(config)
-
-    with statement_path.open() as csv_file:
-        transactions = handler.merge_transactions(
-            handler.parse_transactions(
-                csv.reader(csv_file, delimiter=config.csv_delimiter),
-            ),
-        )
-        if not quiet:
-            transactions = handler.confirm_transactions(transactions)
 
-    for transaction in transactions:
-        print(transaction.to_ledger())
+def _write_transactions(
+    transactions: Iterable[Transaction],
+    journal_path: Optional[pathlib.Path],
+    append: bool,
+    insert: bool,
+    align_column: int,
+) -> int:
+    """
+    Write the transactions to the journal or stdout and return how many were written.
+    """
+    from ledger_importer.writer import LedgerWriter
+    from ledger_importer.writer import append_to_journal
+    from ledger_importer.writer import insert_into_journal
+
+    if append and journal_path:
+        with append_to_journal(journal_path, align_column=align_column) as writer:
+            writer.write_all(transactions)
+    elif insert and journal_path:
+        with insert_into_journal(journal_path, align_column=align_column) as writer:
+            writer.write_all(transactions)
+    else:
+        writer = LedgerWriter(sys.stdout, align_column=align_column)
+        writer.write_all(transactions)
+    return writer.count
+
+
+@app.command("serve")
+def serve(
+    config_path: str = typer.Option(..., help="Python path to the configuration file."),
+    journal_path: Optional[pathlib.Path] = typer.Option(
+        None, help="Path a ledger journal to write & learn accounts from."
+    ),
+    socket: Optional[pathlib.Path] = typer.Option(None, help="Listen on this unix socket instead of localhost."),
+    port: int = typer.Option(8765, help="Port listened on localhost."),
+    workers: int = typer.Option(1, min=1, help="Number of processes used to parse the statement."),
+    skip_imported: bool = typer.Option(False, help="Skip the transactions already in the journal."),
+    checkpoint: bool = typer.Option(False, help="Only import the rows added to the statements since the last import."),
+    guess_accounts: bool = typer.Option(
+        False, help="Guess the unknown target accounts from the payees already in the journal."
+    ),
+    align_column: int = typer.Option(0, min=0, help="Align amounts to end at this column, 0 to disable."),
+):
+    """
+    Serve imports over http, keeping the journal loaded.
+    """
+    from ledger_importer.importer import Importer
+    from ledger_importer.server import serve
+
+    importer = Importer(
+        load_config(config_path),
+        journal_path=journal_path,
+        workers=workers,
+        skip_imported=skip_imported,
+        checkpoint=checkpoint,
+        guess_accounts=guess_accounts,
+        align_column=align_column,
+    )
+    serve(importer, socket_path=socket, port=port)
+
+
+@app.command("watch")
+def watch(
+    directory: pathlib.Path = typer.Argument(
+        ..., exists=True, file_okay=False, help="Directory where the statements are written."
+    ),
+    config_path: str = typer.Option(..., help="Python path to the configuration file."),
+    journal_path: pathlib.Path = typer.Option(..., help="Path a ledger journal to append the transactions to."),
+    pattern: str = typer.Option("*.csv", help="Glob of the names of the statements."),
+    settle: float = typer.Option(2.0, min=0, help="Seconds a statement must stay unchanged before its import."),
+    polling: bool = typer.Option(False, help="Poll the directory instead of using inotify."),
+    poll_interval: float = typer.Option(1.0, min=0.01, help="Seconds between two polls of the directory."),
+    workers: int = typer.Option(1, min=1, help="Number of processes used to parse the statement."),
+    skip_imported: bool = typer.Option(False, help="Skip the transactions already in the journal."),
+    guess_accounts: bool = typer.Option(
+        False, help="Guess the unknown target accounts from the payees already in the journal."
+    ),
+    insert: bool = typer.Option(False, help="Insert the transactions into the journal at their date."),
+    align_column: int = typer.Option(0, min=0, help="Align amounts to end at this column, 0 to disable."),
+):
+    """
+    Import the statements of a directory as they arrive.
+    """
+    from ledger_importer.importer import Importer
+    from ledger_importer.watch import FolderImporter
+    from ledger_importer.watch import open_watcher
+
+    importer = Importer(
+        load_config(config_path),
+        journal_path=journal_path,
+        workers=workers,
+        skip_imported=skip_imported,
+        checkpoint=True,
+        guess_accounts=guess_accounts,
+        align_column=align_column,
+    )
+    watcher = open_watcher(directory, poll_interval=poll_interval, polling=polling)
+    typer.echo(f"Watching {directory} with {type(watcher).__name__}", err=True)
+    FolderImporter(importer, watcher, pattern=pattern, settle=settle, insert=insert).run()
 
 
 def version_callback(value: bool):
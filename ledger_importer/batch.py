@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import datetime
+from array import array
+from decimal import Decimal
+from typing import Iterable
+from typing import Iterator
+
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+from ledger_importer.transaction import intern
+
+
+class TransactionBatch:
+    """
+    Columnar storage of transactions.
+
+    Each field is stored in its own list instead of one object per transaction
+    and posting, transactions are only built again when they are accessed.
+    """
+
+    __slots__ = ("dates", "payees", "postings_end", "accounts", "quantities", "commodities")
+
+    def __init__(self, transactions: Iterable[Transaction] = ()) -> None:
+        self.dates: list[datetime.datetime] = []
+        self.payees: list[str] = []
+        # Index in the postings columns of the end of the postings of each transaction
+        self.postings_end = array("Q")
+        self.accounts: list[str] = []
+        self.quantities: list[Decimal] = []
+        self.commodities: list[str] = []
+        self.extend(transactions)
+
+    def append(self, transaction: Transaction) -> None:
+        self.dates.append(transaction.date)
+        self.payees.append(transaction.payee)
+        for posting in transaction.postings:
+            self.accounts.append(intern(posting.account))
+            self.quantities.append(posting.amount.quantity)
+            self.commodities.append(posting.amount.commodity)
+        self.postings_end.append(len(self.accounts))
+
+    def extend(self, transactions: Iterable[Transaction]) -> None:
+        for transaction in transactions:
+            self.append(transaction)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: int) -> Transaction:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        start = self.postings_end[index - 1] if index else 0
+        return Transaction(
+            date=self.dates[index],
+            payee=self.payees[index],
+            postings=[
+                Posting(
+                    account=self.accounts[i],
+                    amount=Amount(quantity=self.quantities[i], commodity=self.commodities[i]),
+                )
+                for i in range(start, self.postings_end[index])
+            ],
+        )
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for index in range(len(self)):
+            yield self[index]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import BinaryIO
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class FileStamp:
+    """
+    Size and modification time of a file, used to detect when it changed.
+    """
+
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def of(cls, path: pathlib.Path) -> FileStamp:
+        stat = path.stat()
+        return cls(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+
+@contextmanager
+def open_atomically(path: pathlib.Path) -> Iterator[BinaryIO]:
+    """
+    Binary file replacing path when the block exits without error, without ever leaving a partially written file.
+
+    A symlink is followed, so that the file it points to is replaced and the link kept. Other hard
+    links to the file keep its previous content.
+    """
+    path = path.resolve()
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            yield tmp_file
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_atomically(path: pathlib.Path, data: bytes) -> None:
+    """
+    Replace the content of path with data, without ever leaving a partially written file.
+    """
+    with open_atomically(path) as tmp_file:
+        tmp_file.write(data)
+
+
+def cache_dir() -> pathlib.Path:
+    """
+    Directory where ledger_importer keeps its caches.
+    """
+    return pathlib.Path(os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache") / "ledger_importer"
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import pathlib
+from typing import Optional
+
+from ledger_importer.cache import cache_dir
+from ledger_importer.cache import write_atomically
+from ledger_importer.config import Config
+from ledger_importer.statement import Checkpoint
+
+
+class CheckpointStore:
+    """
+    Checkpoints of the statements imported with a config.
+
+    Checkpoints are recorded when statements are read and only written to disk
+    by save, once the import is done.
+    """
+
+    def __init__(self, config: Config, directory: Optional[pathlib.Path] = None) -> None:
+        self.config_name = f"{type(config).__module__}.{type(config).__qualname__}"
+        self.directory = directory or cache_dir() / "checkpoints"
+        self.checkpoints: dict[pathlib.Path, Checkpoint] = {}
+
+    def path(self, statement_path: pathlib.Path) -> pathlib.Path:
+        key = f"{statement_path.resolve()}::{self.config_name}"
+        return self.directory / f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.json"
+
+    def load(self, statement_path: pathlib.Path) -> Optional[Checkpoint]:
+        try:
+            return Checkpoint(**json.loads(self.path(statement_path).read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def record(self, statement_path: pathlib.Path, checkpoint: Checkpoint) -> None:
+        self.checkpoints[statement_path] = checkpoint
+
+    def discard(self) -> None:
+        """
+        Forget the checkpoints recorded since the last save, when the import failed.
+        """
+        self.checkpoints = {}
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for statement_path, checkpoint in self.checkpoints.items():
+            write_atomically(self.path(statement_path), json.dumps(dataclasses.asdict(checkpoint)).encode())
+        self.checkpoints = {}
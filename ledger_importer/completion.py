@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+from ledger_importer.match import Match
+
+# Sorts after any account starting with a given prefix
+PREFIX_END = "\U0010ffff"
+
+
+class _Segment:
+    __slots__ = ("name", "is_account", "children", "keys")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.is_account = False
+        self.children: dict[str, _Segment] = {}
+        # Sorted keys of children, built once all the accounts are added
+        self.keys: list[str] = []
+
+
+class AccountCompleter:
+    """
+    readline completer of accounts.
+
+    Accounts are deduplicated and sorted once so that each completion is a
+    binary search. With by_segment, only the next segment of the accounts is
+    completed (`Expenses:<TAB>` lists `Expenses:Groceries`, `Expenses:Food:`...).
+    Subsequence matching can't use the index and checks every account.
+    """
+
+    def __init__(self, accounts: Iterable[str], by_segment: bool = False, match: Match = Match.prefix) -> None:
+        self.accounts = sorted({account for account in accounts if account})
+        self.by_segment = by_segment
+        self.match = match
+        self.matches: list[str] = []
+
+        # Folded keys are only needed for case-insensitive matching
+        pairs = sorted((self.fold(account), account) for account in self.accounts)
+        self.keys = [key for key, _ in pairs]
+        self.values = [account for _, account in pairs]
+
+        self.root = _Segment("")
+        for account in self.accounts:
+            node = self.root
+            for name in account.split(":"):
+                key = self.fold(name)
+                if key not in node.children:
+                    node.children[key] = _Segment(name)
+                node = node.children[key]
+            node.is_account = True
+        self._sort_keys(self.root)
+
+    def _sort_keys(self, root: _Segment) -> None:
+        nodes = [root]
+        while nodes:
+            node = nodes.pop()
+            node.keys = sorted(node.children)
+            nodes.extend(node.children.values())
+
+    def fold(self, text: str) -> str:
+        return text.casefold() if self.match == Match.ignore_case else text
+
+    def iter_matches(self, text: str) -> Iterator[str]:
+        if self.match == Match.subsequence:
+            pattern = re.compile(".*?".join(map(re.escape, text)), re.IGNORECASE)
+            yield from (account for account in self.accounts if pattern.search(account))
+        elif self.by_segment:
+            yield from self._iter_segment_matches(text)
+        else:
+            key = self.fold(text)
+            yield from self.values[bisect_left(self.keys, key) : bisect_left(self.keys, key + PREFIX_END)]
+
+    def _iter_segment_matches(self, text: str) -> Iterator[str]:
+        *parents, partial = text.split(":")
+        node = self.root
+        prefix = ""
+        for name in parents:
+            found = node.children.get(self.fold(name))
+            if found is None:
+                return
+            node = found
+            prefix += found.name + ":"
+
+        key = self.fold(partial)
+        for child_key in node.keys[bisect_left(node.keys, key) : bisect_left(node.keys, key + PREFIX_END)]:
+            child = node.children[child_key]
+            if child.is_account:
+                yield prefix + child.name
+            if child.children:
+                yield prefix + child.name + ":"
+
+    def complete(self, text: str, state: int) -> Optional[str]:
+        # on first trigger, build possible matches
+        if state == 0:
+            self.matches = list(self.iter_matches(text))
+
+        try:
+            return self.matches[state]
+        except IndexError:
+            pass
+
+        return None
@@ -1,9 +1,25 @@
 from __future__ import annotations
 
+import copyreg
 import datetime
+import hashlib
+import importlib.util
+import pathlib
+import sys
 from abc import ABC
 from abc import abstractmethod
+from functools import cached_property
+from typing import Hashable
+from typing import Optional
+from typing import Sequence
 
+from ledger_importer.rules import Rule
+from ledger_importer.rules import RuleTable
+from ledger_importer.schema import ColumnSchema
+from ledger_importer.schema import CompiledSchema
+from ledger_importer.schema import RowParser
+from ledger_importer.schema import compile_schema
+from ledger_importer.transaction import Amount
 from ledger_importer.transaction import Posting
 from ledger_importer.transaction import Transaction
 
@@ -11,6 +27,16 @@ from ledger_importer.transaction import Transaction
 class Config(ABC):
     skip_lines: int = 1
     csv_delimiter: str = ","
+    # Encoding of the statements, detected when None (a byte order mark always takes precedence)
+    csv_encoding: Optional[str] = None
+    # Detect the delimiter and the quoting of the statements instead of using csv_delimiter
+    csv_sniff_dialect: bool = False
+    # Maximum date difference between two matching transactions, None means no limit
+    transactions_match_window: Optional[datetime.timedelta] = None
+    # Ordered rules giving the target account of a payee, see match_account
+    rules: Sequence[Rule] = ()
+    # Target accounts parse_postings uses when it doesn't know the account, only these are replaced by guesses
+    unknown_accounts: Sequence[str] = ("Expenses", "Income")
 
     @abstractmethod
     def parse_date(self, fields: tuple) -> datetime.datetime:
@@ -24,6 +50,32 @@ class Config(ABC):
     def parse_postings(self, fields: tuple) -> list[Posting]:
         pass
 
+    @cached_property
+    def rule_table(self) -> RuleTable:
+        return RuleTable(self.rules)
+
+    def match_account(
+        self, payee: str, amount: Optional[Amount] = None, default: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Account of the first rule matching the payee (and the amount), default when none matches.
+
+        The rules are compiled once, finding the matching rule doesn't search each rule one by one.
+        """
+        rule = self.rule_table.match(payee, amount.quantity if amount is not None else None)
+        return rule.account if rule else default
+
+    def transactions_match_key(self, transaction: Transaction) -> Hashable:
+        """
+        Only transactions sharing the same key are compared with transactions_match.
+
+        This must be consistent with transactions_match: two matching transactions must always have the same key.
+
+        Default behavior is to group transactions by commodity and absolute quantity.
+        """
+        amount = transaction.postings[0].amount
+        return (amount.commodity, abs(amount.quantity))
+
     def transactions_match(self, transaction1: Transaction, transaction2: Transaction) -> bool:
         """
         Matching transactions will get merged in a single transaction.
@@ -36,3 +88,96 @@ class Config(ABC):
             transaction1.postings[0].amount == transaction2.postings[0].amount.reverse()
             and transaction1.postings[0].account != transaction2.postings[0].account
         )
+
+
+class SchemaConfig(Config):
+    """
+    Config parsing rows with a declarative ColumnSchema.
+
+    The parse_* methods can still be overridden, the others keep using the schema.
+    """
+
+    schema: ColumnSchema
+
+    @cached_property
+    def compiled_schema(self) -> CompiledSchema:
+        return compile_schema(self.schema)
+
+    def __getstate__(self) -> dict:
+        # The compiled functions can't be pickled, they are compiled again when needed
+        state = self.__dict__.copy()
+        state.pop("compiled_schema", None)
+        return state
+
+    def parse_date(self, fields: tuple) -> datetime.datetime:
+        return self.compiled_schema.parse_date(fields)
+
+    def parse_payee(self, fields: tuple) -> str:
+        return self.compiled_schema.parse_payee(fields)
+
+    def parse_postings(self, fields: tuple) -> list[Posting]:
+        return self.compiled_schema.parse_postings(fields)
+
+
+def compile_row_parser(config: Config) -> Optional[RowParser]:
+    """
+    Function parsing a row in one call, when the config parses rows only with its schema.
+    """
+    if not isinstance(config, SchemaConfig):
+        return None
+
+    for method in ("parse_date", "parse_payee", "parse_postings"):
+        if getattr(type(config), method) is not getattr(SchemaConfig, method):
+            return None
+
+    return config.compiled_schema.parse_row
+
+
+def config_module_name(path: pathlib.Path) -> str:
+    """
+    Private module name of a config file, so that its module can't shadow an installed one.
+    """
+    digest = hashlib.blake2b(str(path.resolve()).encode(), digest_size=6).hexdigest()
+    return f"_ledger_importer_config_{path.stem}_{digest}"
+
+
+def load_config_class(path: pathlib.Path, class_name: str) -> type[Config]:
+    """
+    Load the config class class_name of the python file at path.
+
+    The directory of the file is only on sys.path while the file is executed, so
+    that it can import the modules next to it, and the configs of a same file
+    share their module. Configs of the class are pickled as their file path and
+    class name, so that worker processes load the class from the file whatever
+    their start method.
+    """
+    spec = importlib.util.spec_from_file_location(config_module_name(path), path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Can't load a config from {path}")
+
+    module = sys.modules.get(spec.name)
+    if module is None or getattr(module, "__file__", None) != spec.origin:
+        module = importlib.util.module_from_spec(spec)
+        # Registered to let dataclasses find the config class
+        sys.modules[spec.name] = module
+        directory = str(path.resolve().parent)
+        sys.path.insert(0, directory)
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            sys.path.remove(directory)
+
+    config_class: type[Config] = getattr(module, class_name)
+    file_path = str(path.resolve())
+    copyreg.pickle(config_class, lambda config: _reduce_config(config, file_path, class_name))
+    return config_class
+
+
+def _reduce_config(config: Config, file_path: str, class_name: str) -> tuple:
+    # The state is restored by pickle like for any other object
+    return _new_config, (file_path, class_name), config.__reduce_ex__(2)[2]
+
+
+def _new_config(file_path: str, class_name: str) -> Config:
+    config_class = load_config_class(pathlib.Path(file_path), class_name)
+    return config_class.__new__(config_class)
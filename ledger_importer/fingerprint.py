@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import hashlib
+from array import array
+from collections import Counter
+from typing import Iterable
+from typing import Iterator
+
+from ledger_importer.journal_index import JournalIndex
+from ledger_importer.transaction import Transaction
+
+
+def transaction_fingerprint(transaction: Transaction) -> int:
+    """
+    64 bits hash of the date, payee, first posting account and amount of a transaction.
+    """
+    posting = transaction.postings[0] if transaction.postings else None
+    key = "\x1f".join(
+        [
+            transaction.date.strftime("%Y-%m-%d"),
+            transaction.payee.strip(),
+            posting.account if posting else "",
+            format(posting.amount.quantity.normalize(), "f") if posting else "",
+            posting.amount.commodity if posting else "",
+        ]
+    )
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+class FingerprintIndex(JournalIndex):
+    """
+    Multiset of the fingerprints of the transactions of a journal.
+
+    Identical transactions of a same day are counted, so that each one only skips a single imported transaction.
+    """
+
+    suffix = "fingerprints"
+
+    def __init__(self, fingerprints: Iterable[int] = ()) -> None:
+        self.fingerprints: Counter[int] = Counter(fingerprints)
+
+    def __contains__(self, transaction: object) -> bool:
+        return isinstance(transaction, Transaction) and transaction_fingerprint(transaction) in self.fingerprints
+
+    def __len__(self) -> int:
+        return sum(self.fingerprints.values())
+
+    def add(self, transaction: Transaction) -> None:
+        self.fingerprints[transaction_fingerprint(transaction)] += 1
+
+    def skip_known(self, transactions: Iterable[Transaction]) -> Iterator[Transaction]:
+        """
+        Skip the transactions of the index, as many times as each of them is in the index.
+        """
+        skipped: Counter[int] = Counter()
+        for transaction in transactions:
+            fingerprint = transaction_fingerprint(transaction)
+            if skipped[fingerprint] < self.fingerprints.get(fingerprint, 0):
+                skipped[fingerprint] += 1
+            else:
+                yield transaction
+
+    def dumps(self) -> bytes:
+        return array("Q", sorted(self.fingerprints.elements())).tobytes()
+
+    @classmethod
+    def loads(cls, data: bytes) -> FingerprintIndex:
+        fingerprints = array("Q")
+        fingerprints.frombytes(data)
+        return cls(fingerprints)
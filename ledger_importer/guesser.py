@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import Counter
+from typing import Optional
+
+from ledger_importer.journal_index import JournalIndex
+from ledger_importer.transaction import Transaction
+
+# Words of at least 3 letters, numbers and dates vary too much between transactions
+TOKEN = re.compile(r"[^\W\d_]{3,}")
+# Only the first tokens of a payee are used, so that a guess costs the same for every payee
+MAX_TOKENS = 8
+# Accounts of a token that vote for a guess, kept up to date as transactions are added
+TOP_ACCOUNTS = 4
+
+
+def payee_tokens(payee: str) -> list[str]:
+    """
+    Normalised words of a payee.
+    """
+    return list(dict.fromkeys(token.casefold() for token in TOKEN.findall(payee)))[:MAX_TOKENS]
+
+
+class AccountGuesser(JournalIndex):
+    """
+    Inverted index of the payee tokens to the number of times each target account was used with them.
+
+    The target account of a transaction is the account of its second posting.
+
+    Guesses can be made while confirmed transactions are added from another thread.
+    """
+
+    suffix = "guesses"
+
+    def __init__(self, accounts: Optional[dict[str, Counter[str]]] = None) -> None:
+        self.accounts: dict[str, Counter[str]] = accounts or {}
+        # Number of transactions and most used accounts of each token, so that a guess doesn't scan all the accounts
+        self.totals: dict[str, int] = {token: sum(counts.values()) for token, counts in self.accounts.items()}
+        self.top_accounts: dict[str, list[str]] = {
+            token: [account for account, _ in counts.most_common(TOP_ACCOUNTS)]
+            for token, counts in self.accounts.items()
+        }
+        self.lock = threading.Lock()
+
+    def add(self, transaction: Transaction) -> None:
+        if len(transaction.postings) < 2:
+            return
+
+        account = transaction.postings[1].account
+        with self.lock:
+            for token in payee_tokens(transaction.payee):
+                counts = self.accounts.setdefault(token, Counter())
+                counts[account] += 1
+                self.totals[token] = self.totals.get(token, 0) + 1
+
+                top_accounts = self.top_accounts.setdefault(token, [])
+                if account not in top_accounts:
+                    # Only the count of account grew, so it can only take the place of the least used top account
+                    if len(top_accounts) < TOP_ACCOUNTS:
+                        top_accounts.append(account)
+                    elif counts[account] > counts[top_accounts[-1]]:
+                        top_accounts[-1] = account
+                    else:
+                        continue
+                top_accounts.sort(key=counts.__getitem__, reverse=True)
+
+    def guess(self, payee: str) -> Optional[str]:
+        """
+        Target account most often used with the words of payee, if any.
+
+        Each word votes for its most used accounts in proportion of their use.
+        """
+        scores: dict[str, float] = {}
+        with self.lock:
+            for token in payee_tokens(payee):
+                counts = self.accounts.get(token)
+                if not counts:
+                    continue
+                total = self.totals[token]
+                for account in self.top_accounts[token]:
+                    scores[account] = scores.get(account, 0) + counts[account] / total
+
+        if not scores:
+            return None
+
+        return max(scores, key=scores.__getitem__)
+
+    def dumps(self) -> bytes:
+        return json.dumps(self.accounts).encode()
+
+    @classmethod
+    def loads(cls, data: bytes) -> AccountGuesser:
+        if not data:
+            return cls()
+        return cls({token: Counter(counts) for token, counts in json.loads(data).items()})
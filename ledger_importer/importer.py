@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import io
+import pathlib
+from typing import Optional
+
+from ledger_importer.cache import FileStamp
+from ledger_importer.checkpoint import CheckpointStore
+from ledger_importer.config import Config
+from ledger_importer.fingerprint import FingerprintIndex
+from ledger_importer.guesser import AccountGuesser
+from ledger_importer.journal import load_accounts
+from ledger_importer.transaction import Transaction
+from ledger_importer.transactions_handler import TransactionsHandler
+from ledger_importer.writer import LedgerWriter
+from ledger_importer.writer import append_to_journal
+from ledger_importer.writer import insert_into_journal
+
+
+class Importer:
+    """
+    Unattended imports sharing a config and the state of a journal.
+
+    The accounts and the indexes of the journal are kept in memory between imports
+    and refreshed incrementally when the journal changes, so that an import only
+    pays for its statements.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        journal_path: Optional[pathlib.Path] = None,
+        workers: int = 1,
+        skip_imported: bool = False,
+        checkpoint: bool = False,
+        guess_accounts: bool = False,
+        align_column: int = 0,
+    ) -> None:
+        self.config = config
+        self.journal_path = journal_path
+        self.workers = workers
+        self.align_column = align_column
+        self.checkpoints = CheckpointStore(config) if checkpoint else None
+
+        self.stamp: Optional[FileStamp] = None
+        self.accounts: list[str] = []
+        self.fingerprints = FingerprintIndex() if journal_path and skip_imported else None
+        self.guesser = AccountGuesser() if journal_path and guess_accounts else None
+
+    def refresh(self) -> None:
+        """
+        Update the accounts and the indexes when the journal changed since the last refresh.
+        """
+        if self.journal_path is None or not self.journal_path.exists():
+            return
+
+        stamp = FileStamp.of(self.journal_path)
+        if stamp == self.stamp:
+            return
+
+        if self.stamp is None:
+            # The indexes saved next to the journal are loaded on the first refresh
+            if self.fingerprints is not None:
+                self.fingerprints = FingerprintIndex.load(self.journal_path)
+            if self.guesser is not None:
+                self.guesser = AccountGuesser.load(self.journal_path)
+        else:
+            if self.fingerprints is not None:
+                self.fingerprints = self.fingerprints.refresh(self.journal_path)
+            if self.guesser is not None:
+                self.guesser = self.guesser.refresh(self.journal_path)
+        self.accounts = load_accounts(self.journal_path)
+        self.stamp = stamp
+
+    def import_transactions(
+        self, statement_paths: list[pathlib.Path], append: bool = False, insert: bool = False
+    ) -> list[Transaction]:
+        """
+        Import statements without confirmation and return their new transactions.
+
+        With append, the transactions are also appended to the journal, and with
+        insert, they are inserted into the journal at their date.
+        """
+        self.refresh()
+        handler = TransactionsHandler(
+            self.config,
+            workers=self.workers,
+            known_transactions=self.fingerprints,
+            checkpoints=self.checkpoints,
+            guesser=self.guesser,
+        )
+        try:
+            transactions = handler.merge_transactions(handler.parse_statements(statement_paths))
+
+            if append and self.journal_path:
+                with append_to_journal(self.journal_path, align_column=self.align_column) as writer:
+                    writer.write_all(transactions)
+            elif insert and self.journal_path:
+                with insert_into_journal(self.journal_path, align_column=self.align_column) as writer:
+                    writer.write_all(transactions)
+        except BaseException:
+            # The statements read before the failure are imported again by the next import
+            if self.checkpoints:
+                self.checkpoints.discard()
+            raise
+
+        if self.checkpoints:
+            self.checkpoints.save()
+
+        return transactions
+
+    def import_statements(self, statement_paths: list[pathlib.Path], append: bool = False, insert: bool = False) -> str:
+        """
+        Import statements like import_transactions and return the ledger text of their new transactions.
+        """
+        output = io.StringIO()
+        LedgerWriter(output, align_column=self.align_column).write_all(
+            self.import_transactions(statement_paths, append=append, insert=insert)
+        )
+        return output.getvalue()
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import datetime
+import glob
+import hashlib
+import json
+import os
+import pathlib
+import re
+import sys
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from decimal import InvalidOperation
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+from ledger_importer.cache import FileStamp
+from ledger_importer.cache import cache_dir
+from ledger_importer.cache import write_atomically
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+
+TRANSACTION_LINE = re.compile(
+    r"^(\d{4})[/-](\d{1,2})[/-](\d{1,2})(?:=\S*)?(?:\s+[*!])?(?:\s+\([^)]*\))?(?:\s+(.*?))?(?:(?:  |\t)\s*;.*)?\s*$"
+)
+# Account and amount are separated by at least two spaces or a tab
+POSTING_LINE = re.compile(r"^[ \t]+(?:[*!]\s*)?([^;\s](?:[^\t;]*?[^\s;])?)(?:(?:  |\t)\s*([^;]*?))?\s*(?:;.*)?$")
+ACCOUNT_LINE = re.compile(r"^account[ \t]+([^;\s](?:[^;\t]*?[^;\s])?)(?:(?:  |\t|\s*;).*)?$")
+INCLUDE_LINE = re.compile(r"^!?include[ \t]+(.+?)[ \t]*$")
+QUANTITY = re.compile(r"[-+]?\s*\d[\d,]*(?:\.\d+)?")
+
+
+def parse_amount(text: str) -> Optional[Amount]:
+    """
+    Parse a ledger amount such as `-150 €`, `$12.50` or `1,000.00 EUR`.
+    """
+    m = QUANTITY.search(text)
+    if not m:
+        return None
+
+    try:
+        quantity = Decimal(re.sub(r"[\s,+]", "", m.group()))
+    except InvalidOperation:
+        return None
+
+    commodity = (text[: m.start()] + text[m.end() :]).strip()
+    if commodity.startswith("-"):
+        # Sign written before the commodity, such as `-$12.50`
+        quantity, commodity = -quantity, commodity[1:].strip()
+
+    return Amount(quantity=quantity, commodity=commodity)
+
+
+def balance_postings(postings: list[tuple[str, Optional[Amount]]]) -> list[Posting]:
+    """
+    Fill in the posting without amount, ledger allows one per transaction.
+    """
+    elided = [account for account, amount in postings if amount is None]
+    amounts = [amount for _, amount in postings if amount is not None]
+    balance: Optional[Amount] = None
+    if len(elided) == 1 and amounts and len({amount.commodity for amount in amounts}) == 1:
+        balance = Amount(
+            quantity=-sum((amount.quantity for amount in amounts), Decimal(0)), commodity=amounts[0].commodity
+        )
+
+    balanced_postings: list[Posting] = []
+    for account, amount in postings:
+        amount = amount or balance
+        if amount is not None:
+            balanced_postings.append(Posting(account=account, amount=amount))
+    return balanced_postings
+
+
+def iter_journal_transactions(lines: Iterable[str]) -> Iterator[Transaction]:
+    """
+    Parse the transactions of a ledger journal.
+
+    Only the transaction header and its postings are parsed, other directives are ignored.
+    """
+    header: Optional[tuple[datetime.datetime, str]] = None
+    postings: list[tuple[str, Optional[Amount]]] = []
+
+    for line in lines:
+        if header is not None and line[:1] in (" ", "\t"):
+            m = POSTING_LINE.match(line)
+            if m:
+                account, amount = m.groups()
+                postings.append((account, parse_amount(amount) if amount else None))
+            continue
+
+        if header is not None:
+            yield Transaction(date=header[0], payee=header[1], postings=balance_postings(postings))
+            header, postings = None, []
+
+        m = TRANSACTION_LINE.match(line)
+        if m:
+            year, month, day, payee = m.groups()
+            try:
+                header = (datetime.datetime(int(year), int(month), int(day)), payee or "")
+            except ValueError:
+                continue
+
+    if header is not None:
+        yield Transaction(date=header[0], payee=header[1], postings=balance_postings(postings))
+
+
+def iter_journal_accounts(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yield the accounts declared with an account directive or used in a posting, without duplicates.
+    """
+    accounts: set[str] = set()
+    # Whether indented lines are postings (in a transaction) or sub-directives
+    in_transaction = False
+
+    for line in lines:
+        if line[:1] in (" ", "\t"):
+            if not in_transaction:
+                continue
+            m = POSTING_LINE.match(line)
+            if not m:
+                continue
+            # Virtual postings are written (Account) or [Account]
+            account = m.group(1).strip("()[]")
+        else:
+            in_transaction = line[:1].isdigit() or line[:1] in ("=", "~")
+            if not line.startswith("account"):
+                continue
+            m = ACCOUNT_LINE.match(line)
+            if not m:
+                continue
+            account = m.group(1)
+
+        if account not in accounts:
+            accounts.add(account)
+            yield account
+
+
+def parse_accounts(data: str) -> list[str]:
+    return list(iter_journal_accounts(data.split("\n")))
+
+
+def collect_includes(lines: Iterable[str], includes: list[str]) -> Iterator[str]:
+    """
+    Yield the lines, appending the files of their include directives to includes.
+    """
+    for line in lines:
+        if line.startswith(("include", "!include")):
+            m = INCLUDE_LINE.match(line)
+            if m:
+                includes.append(m.group(1))
+        yield line
+
+
+def scan_journal(lines: Iterable[str]) -> tuple[list[str], list[str]]:
+    """
+    Accounts and include directives of a journal file.
+    """
+    includes: list[str] = []
+    return list(iter_journal_accounts(collect_includes(lines, includes))), includes
+
+
+def scan_journal_file(journal_path: pathlib.Path, cache_directory: pathlib.Path) -> tuple[list[str], list[str]]:
+    """
+    scan_journal of a single file, cached on disk until the file changes.
+    """
+    stamp = FileStamp.of(journal_path)
+    key = hashlib.blake2b(str(journal_path).encode(), digest_size=16).hexdigest()
+    cache_path = cache_directory / f"{key}.json"
+
+    try:
+        cache = json.loads(cache_path.read_text())
+        if FileStamp(cache["size"], cache["mtime_ns"]) == stamp:
+            return cache["accounts"], cache["includes"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    with journal_path.open(encoding="utf-8", errors="replace") as journal_file:
+        accounts, includes = scan_journal(journal_file)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomically(
+        cache_path,
+        json.dumps(
+            {"size": stamp.size, "mtime_ns": stamp.mtime_ns, "accounts": accounts, "includes": includes}
+        ).encode(),
+    )
+    return accounts, includes
+
+
+def resolve_include(include: str, journal_path: pathlib.Path) -> list[pathlib.Path]:
+    """
+    Files matched by an include directive, relative paths are relative to the including file.
+    """
+    pattern = os.path.join(journal_path.parent, os.path.expanduser(include))
+    if any(c in pattern for c in "*?["):
+        return [pathlib.Path(path).resolve() for path in sorted(glob.glob(pattern))]
+    return [pathlib.Path(pattern).resolve()]
+
+
+def load_accounts(journal_path: pathlib.Path, cache_directory: Optional[pathlib.Path] = None) -> list[str]:
+    """
+    Accounts of a journal and of the files it includes.
+
+    Included files are scanned concurrently and each file is cached on disk until it changes.
+    """
+    cache_directory = cache_directory or cache_dir() / "accounts"
+    scans: dict[pathlib.Path, Future[tuple[list[str], list[str]]]] = {}
+    accounts: dict[str, None] = {}
+
+    with ThreadPoolExecutor() as executor:
+
+        def scan(path: pathlib.Path) -> None:
+            if path not in scans:
+                scans[path] = executor.submit(scan_journal_file, path, cache_directory)
+
+        def visit(path: pathlib.Path, visited: set[pathlib.Path]) -> None:
+            # Files are visited once, which also protects against include cycles
+            visited.add(path)
+            try:
+                file_accounts, includes = scans[path].result()
+            except OSError as e:
+                print(f"Can't read accounts from {path}: {e}", file=sys.stderr)
+                return
+
+            accounts.update(dict.fromkeys(file_accounts))
+
+            included_paths = [
+                included_path
+                for include in includes
+                for included_path in resolve_include(include, path)
+                if included_path not in visited
+            ]
+            # Start scanning all the included files before waiting for the first one
+            for included_path in included_paths:
+                scan(included_path)
+            for included_path in included_paths:
+                if included_path not in visited:
+                    visit(included_path, visited)
+
+        root = journal_path.resolve()
+        scan(root)
+        visit(root, set())
+
+    return list(accounts)
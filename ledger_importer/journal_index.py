@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import pathlib
+import sys
+from abc import ABC
+from abc import abstractmethod
+from typing import BinaryIO
+from typing import Optional
+from typing import Type
+from typing import TypeVar
+
+from ledger_importer.cache import FileStamp
+from ledger_importer.cache import write_atomically
+from ledger_importer.journal import collect_includes
+from ledger_importer.journal import iter_journal_transactions
+from ledger_importer.journal import resolve_include
+from ledger_importer.transaction import Transaction
+
+# Bytes hashed before the indexed size to check that the journal was only appended to
+TAIL_SIZE = 4096
+
+T = TypeVar("T", bound="JournalIndex")
+
+
+def tail_hash(journal_file: BinaryIO, size: int) -> str:
+    journal_file.seek(max(size - TAIL_SIZE, 0))
+    return hashlib.blake2b(journal_file.read(min(size, TAIL_SIZE))).hexdigest()
+
+
+def is_rewritten(path: pathlib.Path, indexed_file: dict) -> bool:
+    """
+    Whether the file was changed otherwise than by appending lines to it since it was indexed as indexed_file.
+    """
+    try:
+        stamp = FileStamp.of(path)
+        if FileStamp(indexed_file["size"], indexed_file["mtime_ns"]) == stamp:
+            return False
+        with path.open("rb") as journal_file:
+            return (
+                indexed_file["size"] > stamp.size
+                or tail_hash(journal_file, indexed_file["size"]) != indexed_file["tail"]
+            )
+    except OSError:
+        return True
+
+
+class JournalIndex(ABC):
+    """
+    Index built from the transactions of a journal.
+
+    The index is persisted next to the journal and only the lines appended to the
+    journal and to the files it includes since the last run are parsed again.
+    """
+
+    # Extension of the file storing the index next to the journal
+    suffix: str
+    # State of the journal files the index was built from, as saved in the index file
+    header: Optional[dict] = None
+
+    @abstractmethod
+    def add(self, transaction: Transaction) -> None:
+        pass
+
+    @abstractmethod
+    def dumps(self) -> bytes:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def loads(cls: Type[T], data: bytes) -> T:
+        pass
+
+    @classmethod
+    def index_path(cls, journal_path: pathlib.Path) -> pathlib.Path:
+        return journal_path.with_name(f".{journal_path.name}.{cls.suffix}")
+
+    def update(self, journal_file: BinaryIO) -> list[str]:
+        """
+        Add the transactions read from the current position of journal_file and return the include directives read.
+        """
+        includes: list[str] = []
+        lines = io.TextIOWrapper(journal_file, encoding="utf-8", errors="replace")
+        for transaction in iter_journal_transactions(collect_includes(lines, includes)):
+            if transaction.postings:
+                self.add(transaction)
+        lines.detach()
+        return includes
+
+    def update_file(self, path: pathlib.Path, indexed_file: Optional[dict]) -> dict:
+        """
+        Add the transactions appended to path since it was indexed as indexed_file and return its new state.
+        """
+        stamp = FileStamp.of(path)
+        if indexed_file is not None and FileStamp(indexed_file["size"], indexed_file["mtime_ns"]) == stamp:
+            return indexed_file
+
+        includes: list[str] = []
+        with path.open("rb") as journal_file:
+            if indexed_file is not None:
+                journal_file.seek(indexed_file["size"])
+                includes.extend(indexed_file["includes"])
+            includes.extend(self.update(journal_file))
+            tail = tail_hash(journal_file, stamp.size)
+        return {"size": stamp.size, "mtime_ns": stamp.mtime_ns, "tail": tail, "includes": includes}
+
+    def update_files(self, journal_path: pathlib.Path, indexed_files: dict[str, dict]) -> dict[str, dict]:
+        """
+        Add the transactions appended to journal_path and to the files it includes, and return their new state.
+        """
+        files: dict[str, dict] = {}
+        paths = [journal_path]
+        while paths:
+            path = paths.pop()
+            # Files are read once, which also protects against include cycles
+            if str(path) in files:
+                continue
+            try:
+                files[str(path)] = self.update_file(path, indexed_files.get(str(path)))
+            except OSError as e:
+                if path == journal_path:
+                    raise
+                print(f"Can't read transactions from {path}: {e}", file=sys.stderr)
+                continue
+            for include in files[str(path)]["includes"]:
+                paths.extend(resolve_include(include, path))
+        return files
+
+    @classmethod
+    def load(cls: Type[T], journal_path: pathlib.Path) -> T:
+        """
+        Load the index of journal_path, updating and saving it when the journal changed.
+        """
+        header: Optional[dict] = None
+
+        try:
+            with cls.index_path(journal_path).open("rb") as index_file:
+                header = json.loads(index_file.readline())
+                index = cls.loads(index_file.read())
+        except (OSError, ValueError):
+            return cls.loads(b"").refresh(journal_path)
+
+        index.header = header
+        return index.refresh(journal_path)
+
+    def refresh(self: T, journal_path: pathlib.Path) -> T:
+        """
+        Index of the current journal_path and of the files it includes, updated and saved when one of them changed.
+
+        When the files were only appended to, only the appended lines and the newly included
+        files are read and added to this index, else a new index is built.
+        """
+        indexed_files: dict[str, dict] = (self.header or {}).get("files") or {}
+        index = self
+        if not indexed_files or any(is_rewritten(pathlib.Path(path), file) for path, file in indexed_files.items()):
+            index, indexed_files = type(self).loads(b""), {}
+
+        files = index.update_files(journal_path.resolve(), indexed_files)
+        if not files.keys() >= indexed_files.keys():
+            # An indexed file is no longer included
+            return type(self).loads(b"").refresh(journal_path)
+        if files != indexed_files:
+            index.save(journal_path, files)
+        return index
+
+    def save(self, journal_path: pathlib.Path, files: dict[str, dict]) -> None:
+        header = {"files": files}
+        write_atomically(self.index_path(journal_path), json.dumps(header).encode() + b"\n" + self.dumps())
+        self.header = header
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import pathlib
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    statement_path: pathlib.Path
+    config_path: str
+
+
+@dataclass(frozen=True)
+class Manifest:
+    """
+    Statements imported together, each with its own config.
+
+    Transfers between the statements are matched with the config of match_config_path,
+    or the config of the first statement when unset.
+    """
+
+    entries: list[ManifestEntry]
+    match_config_path: Optional[str] = None
+
+    @property
+    def config_paths(self) -> list[str]:
+        return list(dict.fromkeys(entry.config_path for entry in self.entries))
+
+
+def resolve_config_path(config_path: str, directory: pathlib.Path) -> str:
+    """
+    Make the file of a "path/to/config.py::ClassName" config path relative to directory.
+    """
+    file_path, separator, class_name = config_path.rpartition("::")
+    if not separator:
+        return config_path
+    return f"{directory / pathlib.Path(file_path).expanduser()}::{class_name}"
+
+
+def load_manifest(manifest_path: pathlib.Path) -> Manifest:
+    """
+    Read a json manifest:
+
+        {
+            "statements": [
+                {"statement_path": "bank-a.csv", "config_path": "configs/bank_a.py::BankA"},
+                {"statement_path": "bank-b.csv", "config_path": "configs/bank_b.py::BankB"}
+            ],
+            "match_config_path": "configs/bank_a.py::BankA"
+        }
+
+    Relative paths are relative to the manifest. Raises ValueError when the manifest is invalid.
+    """
+    directory = manifest_path.parent
+    try:
+        data = json.loads(manifest_path.read_text())
+        entries = [
+            ManifestEntry(
+                statement_path=directory / pathlib.Path(statement["statement_path"]).expanduser(),
+                config_path=resolve_config_path(statement["config_path"], directory),
+            )
+            for statement in data["statements"]
+        ]
+        match_config_path = data.get("match_config_path")
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid manifest {manifest_path}: {e!r}") from e
+
+    if not entries:
+        raise ValueError(f"Invalid manifest {manifest_path}: no statements")
+    return Manifest(
+        entries=entries,
+        match_config_path=resolve_config_path(match_config_path, directory) if match_config_path else None,
+    )
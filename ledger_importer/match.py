@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from enum import Enum
+
+
+class Match(str, Enum):
+    """
+    How typed text is matched against accounts by the completion.
+
+    Kept out of ledger_importer.completion, which the cli only imports to ask questions.
+    """
+
+    prefix = "prefix"
+    ignore_case = "ignore-case"
+    subsequence = "subsequence"
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import pathlib
+import pickle
+import sys
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain
+from itertools import islice
+from typing import Deque
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+
+from ledger_importer.config import Config
+from ledger_importer.statement import open_statement
+from ledger_importer.transaction import Transaction
+from ledger_importer.transactions_handler import TransactionsHandler
+
+CHUNK_SIZE = 5_000
+
+# Handler of the worker process, built once from the pickled config
+_handler: Optional[TransactionsHandler] = None
+
+
+def _init_worker(pickled_config: bytes) -> None:
+    global _handler
+    _handler = TransactionsHandler(pickle.loads(pickled_config))
+
+
+def _parse_rows(rows: Sequence[Sequence[str]]) -> list[Transaction]:
+    assert _handler is not None
+    return [_handler.row_to_transaction(tuple(row)) for row in rows]
+
+
+def iter_chunks(rows: Iterable[tuple], chunk_size: int) -> Iterator[list[tuple]]:
+    iterator = iter(rows)
+    while True:
+        chunk = [tuple(row) for row in islice(iterator, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_statement(statement_path: pathlib.Path) -> list[Transaction]:
+    assert _handler is not None
+    with open_statement(statement_path, _handler.config) as csv_reader:
+        return _handler.parse_transactions(csv_reader)
+
+
+def pickle_config(config: Config) -> Optional[bytes]:
+    try:
+        return pickle.dumps(config)
+    except Exception as e:
+        print(f"Can't send the config to workers ({e!r}), parsing in a single process.", file=sys.stderr)
+        return None
+
+
+def parse_rows(
+    config: Config, rows: Iterable[tuple], workers: int, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Transaction]:
+    """
+    Parse rows into transactions in a pool of workers processes, in the order of the rows.
+
+    The config is pickled and rebuilt once in each worker. When it can't be pickled
+    or rebuilt in a worker, the rows are parsed in the current process instead.
+    """
+    return parse_chunks(config, iter_chunks(rows, chunk_size), workers)
+
+
+def parse_chunks(config: Config, chunks: Iterable[Sequence[Sequence[str]]], workers: int) -> Iterator[Transaction]:
+    """
+    Same as parse_rows, with rows already split in chunks sent as is to the workers.
+    """
+    handler = TransactionsHandler(config)
+    chunks = iter(chunks)
+
+    pickled_config = pickle_config(config)
+    if pickled_config is not None:
+        pending: Deque[tuple[Sequence[Sequence[str]], Future[list[Transaction]]]] = deque()
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(pickled_config,)) as executor:
+            try:
+                for chunk in chunks:
+                    try:
+                        future = executor.submit(_parse_rows, chunk)
+                    except BrokenProcessPool:
+                        # The chunk is parsed below, before the chunks not read yet
+                        chunks = chain([chunk], chunks)
+                        raise
+                    pending.append((chunk, future))
+                    # Keep a bounded number of chunks in flight
+                    while len(pending) > 2 * workers:
+                        transactions = pending[0][1].result()
+                        pending.popleft()
+                        yield from transactions
+
+                while pending:
+                    transactions = pending[0][1].result()
+                    pending.popleft()
+                    yield from transactions
+            except BrokenProcessPool as e:
+                print(f"Can't parse rows in workers ({e!r}), parsing in a single process.", file=sys.stderr)
+
+        # Rows sent to the broken pool are parsed again
+        for chunk, _ in pending:
+            yield from (handler.row_to_transaction(tuple(row)) for row in chunk)
+
+    for chunk in chunks:
+        yield from (handler.row_to_transaction(tuple(row)) for row in chunk)
+
+
+def parse_statements(config: Config, statement_paths: list[pathlib.Path], workers: int) -> list[list[Transaction]]:
+    """
+    Parse and sort each statement on its own in a pool of workers processes.
+
+    Falls back to the current process like parse_rows.
+    """
+    pickled_config = pickle_config(config)
+    if pickled_config is not None:
+        try:
+            with ProcessPoolExecutor(
+                min(workers, len(statement_paths)), initializer=_init_worker, initargs=(pickled_config,)
+            ) as executor:
+                return list(executor.map(_parse_statement, statement_paths))
+        except BrokenProcessPool as e:
+            print(f"Can't parse statements in workers ({e!r}), parsing in a single process.", file=sys.stderr)
+
+    handler = TransactionsHandler(config)
+    transactions: list[list[Transaction]] = []
+    for statement_path in statement_paths:
+        with open_statement(statement_path, config) as csv_reader:
+            transactions.append(handler.parse_transactions(csv_reader))
+    return transactions
+
+
+def _parse_config_statement(pickled_config: bytes, statement_path: pathlib.Path) -> list[Transaction]:
+    handler = TransactionsHandler(pickle.loads(pickled_config))
+    with open_statement(statement_path, handler.config) as csv_reader:
+        return handler.parse_transactions(csv_reader)
+
+
+def parse_config_statements(statements: Sequence[tuple[Config, pathlib.Path]], workers: int) -> list[list[Transaction]]:
+    """
+    Parse and sort statements, each with its own config, in a pool of workers processes.
+
+    The statements whose config can't be pickled, that failed in a worker, or that
+    were sent to a broken pool, are parsed in the current process.
+    """
+    statements_transactions: list[Optional[list[Transaction]]] = [None] * len(statements)
+
+    if workers > 1 and len(statements) > 1:
+        pickled_configs: dict[int, Optional[bytes]] = {}
+        for config, _ in statements:
+            if id(config) not in pickled_configs:
+                pickled_configs[id(config)] = pickle_config(config)
+
+        try:
+            with ProcessPoolExecutor(min(workers, len(statements))) as executor:
+                futures: dict[int, Future[list[Transaction]]] = {}
+                for index, (config, statement_path) in enumerate(statements):
+                    pickled_config = pickled_configs[id(config)]
+                    if pickled_config is not None:
+                        futures[index] = executor.submit(_parse_config_statement, pickled_config, statement_path)
+                for index, future in futures.items():
+                    try:
+                        statements_transactions[index] = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        # Like a config whose class can't be loaded by the worker
+                        print(
+                            f"Can't parse {statements[index][1]} in a worker ({e!r}), parsing it in the current process.",
+                            file=sys.stderr,
+                        )
+        except BrokenProcessPool as e:
+            print(f"Can't parse statements in workers ({e!r}), parsing in a single process.", file=sys.stderr)
+
+    for index, (config, statement_path) in enumerate(statements):
+        if statements_transactions[index] is None:
+            with open_statement(statement_path, config) as csv_reader:
+                statements_transactions[index] = TransactionsHandler(config).parse_transactions(csv_reader)
+
+    return [transactions or [] for transactions in statements_transactions]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import datetime
+import re
+from decimal import Decimal
+from decimal import InvalidOperation
+from functools import lru_cache
+from typing import Callable
+from typing import Optional
+
+from ledger_importer.transaction import Amount
+
+# Formats made of a day, a month and a 4 digits year separated by the same character
+FAST_DATE_FORMAT = re.compile(r"^%([dmY])([^%])%([dmY])\2%([dmY])$")
+# Number of distinct dates parsed with a format that are kept in cache
+DATE_CACHE_SIZE = 4096
+# Last separator followed by 1 or 2 digits, used to guess the decimal separator
+DECIMAL_SEPARATOR = re.compile(r"[.,](?=\d{1,2}$)")
+NEGATIVE_PARENTHESES = re.compile(r"^\((.*)\)$")
+# Spaces written around amounts and between their digits, including the no-break spaces of French locales
+AMOUNT_SPACES = " \u00a0\u202f"
+
+
+@lru_cache(maxsize=None)
+def date_parser(date_format: str) -> Callable[[str], datetime.datetime]:
+    """
+    Cached function parsing dates written with date_format, like datetime.strptime.
+
+    Formats such as `%d/%m/%Y`, `%m-%d-%Y` or `%Y-%m-%d` are parsed without strptime.
+    """
+    m = FAST_DATE_FORMAT.match(date_format)
+    if not m or len({m.group(1), m.group(3), m.group(4)}) != 3:
+
+        @lru_cache(maxsize=DATE_CACHE_SIZE)
+        def parse_with_strptime(value: str) -> datetime.datetime:
+            return datetime.datetime.strptime(value, date_format)
+
+        return parse_with_strptime
+
+    separator = m.group(2)
+    fields = (m.group(1), m.group(3), m.group(4))
+    year_index, month_index, day_index = fields.index("Y"), fields.index("m"), fields.index("d")
+
+    @lru_cache(maxsize=DATE_CACHE_SIZE)
+    def parse(value: str) -> datetime.datetime:
+        parts = value.split(separator)
+        if len(parts) == 3 and len(parts[year_index]) == 4 and all(part.isdigit() for part in parts):
+            try:
+                return datetime.datetime(int(parts[year_index]), int(parts[month_index]), int(parts[day_index]))
+            except ValueError:
+                pass
+        # Let strptime raise its usual error
+        return datetime.datetime.strptime(value, date_format)
+
+    return parse
+
+
+def parse_date(value: str, date_format: str) -> datetime.datetime:
+    """
+    datetime.strptime with a cache and fast paths for common formats.
+    """
+    return date_parser(date_format)(value)
+
+
+@lru_cache(maxsize=None)
+def amount_table(commodity: str, thousands_separator: str, decimal_separator: str) -> dict[int, Optional[str]]:
+    return str.maketrans(
+        {
+            **{character: None for character in f"{thousands_separator}{commodity}{AMOUNT_SPACES}+"},
+            decimal_separator: ".",
+        }
+    )
+
+
+def parse_amount(
+    value: str,
+    commodity: str,
+    decimal_separator: Optional[str] = None,
+    thousands_separator: Optional[str] = None,
+) -> Amount:
+    """
+    Parse an amount such as `-1 234,56 €`, `(12.50)` or `1,000.00` into an Amount of commodity.
+
+    When decimal_separator isn't given, it's the last `.` or `,` followed by one or two digits.
+    When thousands_separator isn't given, it's the other one of `.` and `,`.
+    """
+    value = value.strip()
+    negative = False
+    m = NEGATIVE_PARENTHESES.match(value)
+    if m:
+        value, negative = m.group(1), True
+    elif value.endswith("-"):
+        value, negative = value[:-1], True
+
+    if decimal_separator is None:
+        separator = DECIMAL_SEPARATOR.search(value.rstrip(f"{commodity}{AMOUNT_SPACES}"))
+        decimal_separator = separator.group() if separator else "."
+    if thousands_separator is None:
+        thousands_separator = "," if decimal_separator == "." else "."
+
+    try:
+        quantity = Decimal(value.translate(amount_table(commodity, thousands_separator, decimal_separator)))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value!r}") from None
+
+    return Amount(quantity=-quantity if negative else quantity, commodity=commodity)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+from queue import Full
+from queue import Queue
+from typing import Generator
+from typing import Iterable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Seconds between two checks that the consumer is still there, when the queue is full
+PUT_TIMEOUT = 0.1
+
+_END = object()
+
+
+class _Error:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def prefetch(items: Iterable[T], size: int) -> Generator[T, None, None]:
+    """
+    Iterate items in a background thread, up to size items ahead of the consumer.
+
+    Errors raised while iterating items are raised again by the consumer. Closing the
+    returned iterator stops the thread, which closes items when it's a generator.
+    """
+    queue: Queue = Queue(size)
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=PUT_TIMEOUT)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+            else:
+                put(_END)
+        except BaseException as e:
+            put(_Error(e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is _END:
+                return
+            if isinstance(item, _Error):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+from typing import Sequence
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Target account of the transactions whose payee matches pattern.
+
+    The pattern is a regular expression, or a keyword searched as is when literal is set.
+    When min_amount or max_amount are set, the rule only applies to amounts between them (included).
+    """
+
+    pattern: str
+    account: str
+    literal: bool = False
+    ignore_case: bool = False
+    min_amount: Optional[Decimal] = None
+    max_amount: Optional[Decimal] = None
+
+    def accepts(self, quantity: Optional[Decimal]) -> bool:
+        if self.min_amount is None and self.max_amount is None:
+            return True
+        if quantity is None:
+            return False
+        return (self.min_amount is None or quantity >= self.min_amount) and (
+            self.max_amount is None or quantity <= self.max_amount
+        )
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton finding, in a single pass over a text, the lowest index
+    of the keywords it contains.
+    """
+
+    def __init__(self, keywords: Sequence[tuple[int, str]]) -> None:
+        # Transitions, failure links and lowest keyword index ending in each state
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.output: list[Optional[int]] = [None]
+
+        for index, keyword in keywords:
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(None)
+                state = next_state
+            if self.output[state] is None or index < self.output[state]:  # type: ignore[operator]
+                self.output[state] = index
+
+        # Breadth first, so that the failure state of a state is always complete before it
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0) if state else 0
+
+                # Keywords ending in the failure state also end in this state
+                inherited = self.output[self.fail[next_state]]
+                output = self.output[next_state]
+                if inherited is not None and (output is None or inherited < output):
+                    self.output[next_state] = inherited
+
+    def first(self, text: str) -> Optional[int]:
+        goto, fail, output = self.goto, self.fail, self.output
+        first: Optional[int] = None
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            index = output[state]
+            if index is not None and (first is None or index < first):
+                first = index
+        return first
+
+
+class RuleTable:
+    """
+    Ordered rules, the first one matching a payee wins.
+
+    Literal rules are compiled into two keyword automatons (case sensitive and not),
+    so that finding the first literal rule matching a payee is a single pass over it.
+    Regular expression rules are then only searched when they come before that rule.
+    """
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules = tuple(rules)
+        self.keywords = KeywordAutomaton(
+            [(i, rule.pattern) for i, rule in enumerate(self.rules) if rule.literal and not rule.ignore_case]
+        )
+        self.casefolded_keywords = KeywordAutomaton(
+            [(i, rule.pattern.casefold()) for i, rule in enumerate(self.rules) if rule.literal and rule.ignore_case]
+        )
+        self.has_casefolded_keywords = any(rule.literal and rule.ignore_case for rule in self.rules)
+        self.patterns = [
+            (i, re.compile(rule.pattern, re.IGNORECASE if rule.ignore_case else 0))
+            for i, rule in enumerate(self.rules)
+            if not rule.literal
+        ]
+        self.compiled_patterns = dict(self.patterns)
+
+    def _search(self, index: int, payee: str) -> bool:
+        rule = self.rules[index]
+        if not rule.literal:
+            return self.compiled_patterns[index].search(payee) is not None
+        if rule.ignore_case:
+            return rule.pattern.casefold() in payee.casefold()
+        return rule.pattern in payee
+
+    def first_match(self, payee: str) -> Optional[int]:
+        """
+        Index of the first rule matching payee, without checking the amounts.
+        """
+        first = self.keywords.first(payee)
+        if self.has_casefolded_keywords:
+            index = self.casefolded_keywords.first(payee.casefold())
+            if index is not None and (first is None or index < first):
+                first = index
+
+        for index, pattern in self.patterns:
+            if first is not None and index > first:
+                break
+            if pattern.search(payee):
+                return index
+        return first
+
+    def match(self, payee: str, quantity: Optional[Decimal] = None) -> Optional[Rule]:
+        """
+        First rule matching payee and accepting quantity, if any.
+        """
+        index = self.first_match(payee)
+        if index is None:
+            return None
+
+        # Rules refusing the amount are rare, the next rules are then searched one by one
+        while not self.rules[index].accepts(quantity):
+            index = next(
+                (i for i in range(index + 1, len(self.rules)) if self._search(i, payee)),
+                len(self.rules),
+            )
+            if index == len(self.rules):
+                return None
+        return self.rules[index]
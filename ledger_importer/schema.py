@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass
+from decimal import Decimal
+from operator import itemgetter
+from typing import Callable
+from typing import Sequence
+from typing import Union
+
+from ledger_importer.parsing import amount_table
+from ledger_importer.parsing import date_parser
+from ledger_importer.rules import Rule
+from ledger_importer.rules import RuleTable
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+
+RowParser = Callable[[tuple], Transaction]
+
+
+@dataclass(frozen=True)
+class ColumnSchema:
+    """
+    Description of the columns of a statement.
+
+    Amounts are written in the `account` posting, and reversed in the
+    `income_account` or `expense_account` posting depending on their sign,
+    unless one of the `rules` matches the payee.
+    """
+
+    date: int
+    date_format: str
+    # Several payee columns are joined with payee_separator
+    payee: Union[int, Sequence[int]]
+    amount: int
+    account: str
+    commodity: str
+    decimal_separator: str = "."
+    thousands_separator: str = ""
+    payee_separator: str = " "
+    income_account: str = "Income"
+    expense_account: str = "Expenses"
+    rules: Sequence[Rule] = ()
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    parse_date: Callable[[tuple], datetime.datetime]
+    parse_payee: Callable[[tuple], str]
+    parse_postings: Callable[[tuple], list[Posting]]
+    parse_row: RowParser
+
+
+def compile_schema(schema: ColumnSchema) -> CompiledSchema:
+    """
+    Build the functions parsing a row with a schema, everything that doesn't depend on the row is computed once.
+    """
+    date_column = schema.date
+    to_date = date_parser(schema.date_format)
+
+    payee_columns = [schema.payee] if isinstance(schema.payee, int) else list(schema.payee)
+    payee_separator = schema.payee_separator
+    get_payees = itemgetter(*payee_columns)
+    multiple_payees = len(payee_columns) > 1
+
+    amount_column = schema.amount
+    # Remove everything but the digits, the sign and the decimal separator
+    table = amount_table(schema.commodity, schema.thousands_separator, schema.decimal_separator)
+    account = schema.account
+    commodity = schema.commodity
+    income_account = schema.income_account
+    expense_account = schema.expense_account
+    rule_table = RuleTable(schema.rules) if schema.rules else None
+
+    def target_account(payee: str, quantity: Decimal) -> str:
+        if rule_table is not None:
+            rule = rule_table.match(payee, quantity)
+            if rule is not None:
+                return rule.account
+        return income_account if quantity > 0 else expense_account
+
+    def parse_date(row: tuple) -> datetime.datetime:
+        return to_date(row[date_column])
+
+    def parse_payee(row: tuple) -> str:
+        if multiple_payees:
+            return payee_separator.join(payee for payee in get_payees(row) if payee)
+        return get_payees(row)
+
+    def parse_postings(row: tuple) -> list[Posting]:
+        quantity = Decimal(row[amount_column].translate(table))
+        # The payee is only needed by the rules
+        payee = parse_payee(row) if rule_table is not None else ""
+        return [
+            Posting(account=account, amount=Amount(quantity=quantity, commodity=commodity)),
+            Posting(
+                account=target_account(payee, quantity),
+                amount=Amount(quantity=-quantity, commodity=commodity),
+            ),
+        ]
+
+    def parse_row(row: tuple) -> Transaction:
+        quantity = Decimal(row[amount_column].translate(table))
+        payee = (
+            payee_separator.join(payee for payee in get_payees(row) if payee) if multiple_payees else get_payees(row)
+        )
+        return Transaction(
+            date=to_date(row[date_column]),
+            payee=payee,
+            postings=[
+                Posting(account=account, amount=Amount(quantity=quantity, commodity=commodity)),
+                Posting(
+                    account=target_account(payee, quantity),
+                    amount=Amount(quantity=-quantity, commodity=commodity),
+                ),
+            ],
+        )
+
+    return CompiledSchema(
+        parse_date=parse_date, parse_payee=parse_payee, parse_postings=parse_postings, parse_row=parse_row
+    )
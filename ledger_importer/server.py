@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import signal
+import socketserver
+import sys
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from typing import Optional
+from typing import Union
+
+from ledger_importer.importer import Importer
+
+DEFAULT_PORT = 8765
+# Hosts of the requests sent to the server by local clients, other hosts come from a rebound dns name
+LOCAL_HOSTS = ("localhost", "127.0.0.1")
+
+
+class ImportRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /import with a json body {"statement_paths": [...], "append": false, "insert": false}
+    returns the ledger text of the imported transactions. GET /accounts returns the accounts
+    of the journal as json.
+
+    Only local clients such as curl are served: requests sent by web pages (with an
+    Origin header, or a Host other than localhost) are refused, and the body of an
+    import must be sent as application/json, which pages can't send without Origin.
+    """
+
+    server: Union[ImportServer, UnixImportServer]
+
+    def do_POST(self) -> None:
+        if not self.check_client():
+            return
+        if self.path != "/import":
+            self.send_text(404, f"Unknown path {self.path}\n")
+            return
+        if self.headers.get_content_type() != "application/json":
+            self.send_text(415, "Import requests must be sent as application/json\n")
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            statement_paths = [pathlib.Path(path) for path in request["statement_paths"]]
+            append = bool(request.get("append", False))
+            insert = bool(request.get("insert", False))
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_text(400, f"Invalid import request: {e!r}\n")
+            return
+
+        try:
+            text = self.server.importer.import_statements(statement_paths, append=append, insert=insert)
+        except Exception as e:
+            # A broken statement doesn't stop the server
+            self.send_text(422, f"Can't import {', '.join(map(str, statement_paths))}: {e!r}\n")
+            return
+
+        self.send_text(200, text)
+
+    def do_GET(self) -> None:
+        if not self.check_client():
+            return
+        if self.path != "/accounts":
+            self.send_text(404, f"Unknown path {self.path}\n")
+            return
+
+        self.server.importer.refresh()
+        self.send_text(200, json.dumps(self.server.importer.accounts), "application/json")
+
+    def check_client(self) -> bool:
+        """
+        Refuse the requests sent by web pages, and return whether the request can be served.
+        """
+        hostname, _, _ = (self.headers.get("Host") or "localhost").partition(":")
+        if self.headers.get("Origin") is not None or hostname not in LOCAL_HOSTS:
+            self.send_text(403, "Requests from web pages are refused\n")
+            return False
+        return True
+
+    def send_text(self, status: int, text: str, content_type: str = "text/plain; charset=utf-8") -> None:
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Clients of a unix socket have no address
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+
+class ImportServer(HTTPServer):
+    """
+    Server of the import requests on localhost, one request at a time.
+    """
+
+    def __init__(self, port: int, importer: Importer) -> None:
+        super().__init__(("127.0.0.1", port), ImportRequestHandler)
+        self.importer = importer
+
+
+class UnixImportServer(socketserver.UnixStreamServer):
+    """
+    Server of the import requests on a unix socket, one request at a time.
+    """
+
+    def __init__(self, socket_path: pathlib.Path, importer: Importer) -> None:
+        if socket_path.is_socket():
+            # Left by a server that didn't stop cleanly
+            socket_path.unlink()
+        super().__init__(str(socket_path), ImportRequestHandler)
+        self.socket_path = socket_path
+        self.importer = importer
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.socket_path.is_socket():
+            self.socket_path.unlink()
+
+
+def serve(importer: Importer, socket_path: Optional[pathlib.Path] = None, port: int = DEFAULT_PORT) -> None:
+    """
+    Serve import requests until interrupted.
+    """
+    importer.refresh()
+    server: Union[ImportServer, UnixImportServer]
+    if socket_path is not None:
+        server = UnixImportServer(socket_path, importer)
+        print(f"Listening on {socket_path}", file=sys.stderr)
+    else:
+        server = ImportServer(port, importer)
+        print(f"Listening on http://127.0.0.1:{server.server_port}", file=sys.stderr)
+
+    # Stopping the service closes the server, which removes its socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
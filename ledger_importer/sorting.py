@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import datetime
+import heapq
+import pickle
+import tempfile
+from itertools import chain
+from itertools import islice
+from typing import IO
+from typing import Iterable
+from typing import Iterator
+
+from ledger_importer.batch import TransactionBatch
+from ledger_importer.transaction import Transaction
+
+RUN_SIZE = 100_000
+# Transactions of a run pickled at once
+SPILL_BATCH_SIZE = 4096
+
+
+def transaction_date(transaction: Transaction) -> datetime.datetime:
+    return transaction.date
+
+
+def is_sorted(transactions: list[Transaction]) -> bool:
+    return all(t1.date <= t2.date for t1, t2 in zip(transactions, islice(transactions, 1, None)))
+
+
+def is_reverse_sorted(transactions: list[Transaction]) -> bool:
+    return all(t1.date >= t2.date for t1, t2 in zip(transactions, islice(transactions, 1, None)))
+
+
+def sort_run(transactions: list[Transaction]) -> list[Transaction]:
+    """
+    Stable sort of transactions by date, skipping the sort when they're already sorted or reverse-sorted.
+    """
+    if is_sorted(transactions):
+        return transactions
+
+    if is_reverse_sorted(transactions):
+        # Reverse the order of the dates but keep the original order of transactions sharing a date
+        reversed_transactions: list[Transaction] = []
+        end = len(transactions)
+        for start in range(len(transactions) - 1, -1, -1):
+            if start == 0 or transactions[start - 1].date != transactions[start].date:
+                reversed_transactions.extend(transactions[start:end])
+                end = start
+        return reversed_transactions
+
+    return sorted(transactions, key=transaction_date)
+
+
+def spill_run(transactions: list[Transaction]) -> IO[bytes]:
+    run_file = tempfile.TemporaryFile()
+    for start in range(0, len(transactions), SPILL_BATCH_SIZE):
+        # Columns are pickled much faster than one object per transaction and posting
+        pickle.dump(TransactionBatch(transactions[start : start + SPILL_BATCH_SIZE]), run_file, pickle.HIGHEST_PROTOCOL)
+    run_file.seek(0)
+    return run_file
+
+
+def read_run(run_file: IO[bytes]) -> Iterator[Transaction]:
+    while True:
+        try:
+            batch: TransactionBatch = pickle.load(run_file)
+        except EOFError:
+            return
+        yield from batch
+
+
+def sort_transactions(transactions: Iterable[Transaction], run_size: int = RUN_SIZE) -> Iterator[Transaction]:
+    """
+    Sort transactions chronologically while keeping at most run_size transactions in memory.
+
+    Transactions are sorted in runs of run_size that are spilled to temporary files
+    and merged back. Runs that are already sorted or reverse-sorted aren't sorted again,
+    and when the runs follow each other they're chained instead of being merged.
+    """
+    iterator = iter(transactions)
+    run = sort_run(list(islice(iterator, run_size)))
+    if len(run) < run_size:
+        # Everything fits in memory
+        yield from run
+        return
+
+    run_files: list[IO[bytes]] = []
+    bounds: list[tuple[datetime.datetime, datetime.datetime]] = []
+    try:
+        while run:
+            run_files.append(spill_run(run))
+            bounds.append((run[0].date, run[-1].date))
+            run = sort_run(list(islice(iterator, run_size)))
+
+        runs = [read_run(run_file) for run_file in run_files]
+        if all(previous[1] <= following[0] for previous, following in zip(bounds, bounds[1:])):
+            yield from chain.from_iterable(runs)
+        elif all(previous[0] > following[1] for previous, following in zip(bounds, bounds[1:])):
+            yield from chain.from_iterable(reversed(runs))
+        else:
+            yield from heapq.merge(*runs, key=transaction_date)
+    finally:
+        for run_file in run_files:
+            run_file.close()
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import hashlib
+import io
+import locale
+import mmap
+import pathlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import BinaryIO
+from typing import Iterator
+from typing import Optional
+from typing import Type
+from typing import Union
+
+from ledger_importer.config import Config
+
+if TYPE_CHECKING:
+    from ledger_importer.checkpoint import CheckpointStore
+
+
+# Bytes decoded and parsed at once
+CHUNK_SIZE = 1 << 20
+# Bytes used to detect the encoding and the dialect of a statement
+SNIFF_SIZE = 1 << 16
+
+# Byte order marks, UTF-32 first since its little endian mark starts like the UTF-16 one
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+# Bytes that can't be decoded, as escaped by surrogateescape, are shown as the replacement character
+UNDECODABLE_BYTES = {0xDC80 + byte: "\ufffd" for byte in range(128)}
+
+
+@dataclass(frozen=True)
+class StatementFormat:
+    encoding: str
+    # Size of the byte order mark at the start of the statement
+    bom_size: int
+    dialect: Type[csv.Dialect]
+    errors: str = "strict"
+
+
+def detect_encoding(sample: bytes) -> tuple[str, str]:
+    """
+    Encoding and decoding errors handling of a statement without byte order mark.
+    """
+    # Text in UTF-16 has a null byte in most of its characters
+    if sample and sample[1::2].count(0) > len(sample) // 4:
+        return "utf-16-le", "strict"
+    if sample and sample[0::2].count(0) > len(sample) // 4:
+        return "utf-16-be", "strict"
+
+    try:
+        # The sample can end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, False)
+        return "utf-8", "strict"
+    except UnicodeDecodeError:
+        pass
+
+    # The undecodable bytes are escaped rather than replaced, to encode the text back to the same bytes
+    encoding = locale.getpreferredencoding(False)
+    if codecs.lookup(encoding).name != "utf-8":
+        return encoding, "surrogateescape"
+    # Most exports that aren't in UTF-8 are in Windows Latin-1
+    return "cp1252", "surrogateescape"
+
+
+def explicit_byte_order(encoding: str, sample: bytes) -> str:
+    """
+    UTF-16 or UTF-32 encoding with the byte order of the sample, the encoding itself for the others.
+
+    Their codecs without byte order add a byte order mark to every text they encode.
+    """
+    name = codecs.lookup(encoding).name
+    if name == "utf-16":
+        return "utf-16-be" if sample[0::2].count(0) > sample[1::2].count(0) else "utf-16-le"
+    if name == "utf-32":
+        return "utf-32-be" if sample[0::4].count(0) > sample[3::4].count(0) else "utf-32-le"
+    return encoding
+
+
+def sniff_format(sample: bytes, config: Config) -> StatementFormat:
+    """
+    Detect the format of a statement from its first bytes.
+
+    A byte order mark gives the encoding, else Config.csv_encoding is used and when
+    it's not set, the encoding is guessed. The dialect is sniffed from the sample
+    when Config.csv_sniff_dialect is set, else it's csv.excel with Config.csv_delimiter.
+    """
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            bom_size, errors = len(bom), "strict"
+            break
+    else:
+        bom_size = 0
+        if config.csv_encoding:
+            encoding, errors = explicit_byte_order(config.csv_encoding, sample), "strict"
+        else:
+            encoding, errors = detect_encoding(sample)
+
+    dialect: Type[csv.Dialect] = type("StatementDialect", (csv.excel,), {"delimiter": config.csv_delimiter})
+    if config.csv_sniff_dialect:
+        text = codecs.getincrementaldecoder(encoding)("replace").decode(sample[bom_size:], False)
+        try:
+            dialect = csv.Sniffer().sniff(text[: text.rfind("\n") + 1] or text)
+        except csv.Error:
+            pass
+
+    return StatementFormat(encoding=encoding, bom_size=bom_size, dialect=dialect, errors=errors)
+
+
+def map_file(statement_file: BinaryIO) -> Union[mmap.mmap, bytes]:
+    try:
+        return mmap.mmap(statement_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        # Empty files can't be mapped, neither can files that aren't on disk
+        statement_file.seek(0)
+        return statement_file.read()
+
+
+def rows_end(text: str, quotechar: Optional[str], rows: int) -> Optional[int]:
+    """
+    Offset of the end of the first rows of text, None when text has less rows.
+
+    A newline ends a row when it isn't quoted: an even number of quotes precedes it in the row.
+    """
+    position = 0
+    for _ in range(rows):
+        end = text.find("\n", position)
+        while quotechar and end != -1 and text.count(quotechar, position, end) % 2:
+            end = text.find("\n", end + 1)
+        if end == -1:
+            return None
+        position = end + 1
+    return position
+
+
+def last_row_end(text: str, quotechar: Optional[str]) -> int:
+    """
+    Offset of the end of the last complete row of text starting with a row, 0 when there is none.
+    """
+    end = text.rfind("\n")
+    if quotechar and end != -1:
+        quotes = text.count(quotechar, 0, end)
+        while end != -1 and quotes % 2:
+            previous = text.rfind("\n", 0, end)
+            quotes -= text.count(quotechar, previous + 1, end)
+            end = previous
+    return end + 1
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """
+    Position of the last row read in a statement.
+    """
+
+    # Offset of the end of the skipped lines
+    header_end: int
+    # Offsets of the last row read
+    row_start: int
+    row_end: int
+    # Hash of the bytes of the last row read
+    row_hash: str
+
+
+def hash_bytes(statement_file: BinaryIO, start: int, end: int) -> str:
+    position = statement_file.tell()
+    statement_file.seek(start)
+    data = statement_file.read(end - start)
+    statement_file.seek(position)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class StatementReader:
+    """
+    csv reader of a statement that keeps track of the byte offset of its rows.
+
+    The statement is memory-mapped and decoded by chunks of about chunk_size bytes,
+    split on row boundaries, which are parsed at once. Its format is sniffed from
+    its first bytes.
+
+    When given a checkpoint, the skipped lines are read and then the reader
+    jumps right after the last row of the checkpoint.
+    """
+
+    def __init__(
+        self,
+        statement_file: BinaryIO,
+        config: Config,
+        checkpoint: Optional[Checkpoint] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        self.statement_file = statement_file
+        self.data = map_file(statement_file)
+        self.format = sniff_format(self.data[:SNIFF_SIZE], config)
+        self.encoding = self.format.encoding
+        self.quotechar = self.format.dialect.quotechar if self.format.dialect.quoting != csv.QUOTE_NONE else None
+        self.chunk_size = chunk_size
+        self.skip_lines = config.skip_lines
+        self.resumed = checkpoint is not None
+
+        if checkpoint is None:
+            self.header_end = self.row_start = self.row_end = self.format.bom_size
+        else:
+            self.header_end = checkpoint.header_end
+            self.row_start = checkpoint.row_start
+            self.row_end = checkpoint.row_end
+
+        # Data chunk of the last row read, as its offset and text, with the index of the row in it
+        self.chunk: Optional[tuple[int, str]] = None
+        self.row_index = -1
+        self.texts = self.iter_texts(checkpoint)
+        # Rows of the chunk being read
+        self.chunk_rows: Iterator[list[str]] = iter(())
+        self.rows = self.iter_rows()
+
+    def encoded_size(self, text: str) -> int:
+        return len(text.encode(self.encoding, self.format.errors))
+
+    def parse(self, text: str) -> Iterator[list[str]]:
+        if self.format.errors == "surrogateescape":
+            text = text.translate(UNDECODABLE_BYTES)
+        return csv.reader(io.StringIO(text, newline=""), self.format.dialect)
+
+    def iter_texts(self, checkpoint: Optional[Checkpoint]) -> Iterator[tuple[int, str, bool]]:
+        """
+        Text of the statement by chunks of whole rows, with their offset and whether they are the skipped lines.
+        """
+        data = self.data
+        size = len(data)
+        decoder = codecs.getincrementaldecoder(self.encoding)(self.format.errors)
+
+        if checkpoint is not None:
+            yield self.format.bom_size, decoder.decode(data[self.format.bom_size : checkpoint.header_end], True), True
+            decoder.reset()
+            position = checkpoint.row_end
+        else:
+            position = self.format.bom_size
+        header_rows = 0 if checkpoint is not None else self.skip_lines
+
+        carry = ""
+        carry_start = position
+        while position < size:
+            end = min(position + self.chunk_size, size)
+            text = carry + decoder.decode(data[position:end], end == size)
+            position = end
+
+            if header_rows:
+                cut = rows_end(text, self.quotechar, header_rows)
+                if cut is None and position < size:
+                    carry = text
+                    continue
+                cut = len(text) if cut is None else cut
+                self.header_end = self.row_start = self.row_end = carry_start + self.encoded_size(text[:cut])
+                yield carry_start, text[:cut], True
+                text, carry_start, header_rows = text[cut:], self.header_end, 0
+
+            cut = last_row_end(text, self.quotechar) if position < size else len(text)
+            if cut:
+                yield carry_start, text[:cut], False
+            carry = text[cut:]
+            # Bytes kept by the decoder (an incomplete character) and the carried text are read again
+            carry_start = position - len(decoder.getstate()[0]) - self.encoded_size(carry)
+
+    def iter_rows(self) -> Iterator[list[str]]:
+        for offset, text, header in self.texts:
+            if not header:
+                self.chunk = (offset, text)
+            # Parsed lazily, building the list of rows of each chunk is slower
+            self.chunk_rows = self.parse(text)
+            for self.row_index, row in enumerate(self.chunk_rows):
+                yield row
+
+    def iter_chunks(self) -> Iterator[list[list[str]]]:
+        """
+        Rows not read yet, by chunks of about chunk_size bytes.
+        """
+        rows = list(self.chunk_rows)
+        if rows:
+            self.row_index += len(rows)
+            yield rows
+
+        for offset, text, header in self.texts:
+            rows = list(self.parse(text))
+            if not header:
+                self.chunk = (offset, text)
+            self.row_index = len(rows) - 1
+            yield rows
+
+    def __iter__(self) -> Iterator[list[str]]:
+        return self.rows
+
+    def __next__(self) -> list[str]:
+        return next(self.rows)
+
+    def last_row_offsets(self) -> tuple[int, int]:
+        """
+        Offsets of the start and the end of the last row read.
+        """
+        if self.chunk is None or self.row_index < 0:
+            return self.row_start, self.row_end
+
+        offset, text = self.chunk
+        stream = io.StringIO(text, newline="")
+        csv_reader = csv.reader(stream, self.format.dialect)
+        start = 0
+        for _ in range(self.row_index + 1):
+            start = stream.tell()
+            next(csv_reader)
+        return offset + self.encoded_size(text[:start]), offset + self.encoded_size(text[: stream.tell()])
+
+    def checkpoint(self) -> Checkpoint:
+        row_start, row_end = self.last_row_offsets()
+        return Checkpoint(
+            header_end=self.header_end,
+            row_start=row_start,
+            row_end=row_end,
+            row_hash=hash_bytes(self.statement_file, row_start, row_end),
+        )
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    @staticmethod
+    def checkpoint_is_valid(statement_file: BinaryIO, checkpoint: Checkpoint) -> bool:
+        """
+        Check that the statement wasn't rewritten since the checkpoint.
+        """
+        statement_file.seek(0, 2)
+        valid = statement_file.tell() >= checkpoint.row_end and checkpoint.row_hash == hash_bytes(
+            statement_file, checkpoint.row_start, checkpoint.row_end
+        )
+        statement_file.seek(0)
+        return valid
+
+
+@contextmanager
+def open_statement(
+    statement_path: pathlib.Path, config: Config, checkpoints: Optional[CheckpointStore] = None
+) -> Iterator[StatementReader]:
+    """
+    Open a bank statement as a csv reader configured by the config.
+
+    With checkpoints, the rows read by the previous import are skipped and the
+    position of the last row is recorded in checkpoints once the statement is read.
+    """
+    with statement_path.open("rb") as statement_file:
+        checkpoint = checkpoints.load(statement_path) if checkpoints else None
+        if checkpoint and not StatementReader.checkpoint_is_valid(statement_file, checkpoint):
+            checkpoint = None
+
+        reader = StatementReader(statement_file, config, checkpoint)
+        try:
+            yield reader
+
+            if checkpoints:
+                checkpoints.record(statement_path, reader.checkpoint())
+        finally:
+            reader.close()
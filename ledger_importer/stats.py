@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import IO
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Config methods called for each row or each candidate of a merge
+CONFIG_HOOKS = ("parse_date", "parse_payee", "parse_postings", "transactions_match", "transactions_match_key")
+
+
+class Stats:
+    """
+    Wall time and counts of the stages of an import, and time spent in Config hooks.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+        self.counters: Counter[str] = Counter()
+        self.hook_calls: Counter[str] = Counter()
+        self.hook_seconds: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0) + time.perf_counter() - start
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def count_iter(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        for item in iterable:
+            self.counters[name] += 1
+            yield item
+
+    def timed(self, name: str, function: Callable[..., T]) -> Callable[..., T]:
+        """
+        Wrap function to count its calls and the time spent in it.
+        """
+        calls = self.hook_calls
+        seconds = self.hook_seconds
+        seconds.setdefault(name, 0)
+
+        def timed_function(*args: Any, **kwargs: Any) -> T:
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds[name] += time.perf_counter() - start
+                calls[name] += 1
+
+        return timed_function
+
+    def report(self) -> dict:
+        parse_seconds = self.stages.get("parse") or self.stages.get("pipeline")
+        rows_read = self.counters.get("rows_read", 0)
+        return {
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "counters": dict(self.counters),
+            "rows_per_second": round(rows_read / parse_seconds, 1) if parse_seconds else None,
+            "hooks": {
+                name: {"calls": self.hook_calls[name], "seconds": round(seconds, 6)}
+                for name, seconds in self.hook_seconds.items()
+                if self.hook_calls[name]
+            },
+        }
+
+    def write_json(self, output: IO[str]) -> None:
+        json.dump(self.report(), output, indent=2)
+        output.write("\n")
+
+    def write_text(self, output: IO[str]) -> None:
+        report = self.report()
+        lines = ["Stages:"]
+        lines += [f"  {name:<24}{seconds:>12.3f}s" for name, seconds in report["stages"].items()]
+        lines += ["Counters:"]
+        lines += [f"  {name:<24}{count:>12}" for name, count in report["counters"].items()]
+        if report["rows_per_second"] is not None:
+            lines += [f"  {'rows/sec':<24}{report['rows_per_second']:>12.1f}"]
+        lines += ["Config hooks:"]
+        lines += [
+            f"  {name:<24}{hook['calls']:>12} calls{hook['seconds']:>12.3f}s" for name, hook in report["hooks"].items()
+        ]
+        output.write("\n".join(lines) + "\n")
+
+
+def _unwrap(config: Any) -> Any:
+    return config
+
+
+class TimedConfig:
+    """
+    Proxy of a Config timing its hooks.
+
+    It's pickled as the wrapped config, so that workers don't get the proxy.
+    """
+
+    def __init__(self, config: Any, stats: Stats) -> None:
+        self.config = config
+        for hook in CONFIG_HOOKS:
+            setattr(self, hook, stats.timed(hook, getattr(config, hook)))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.config, name)
+
+    def __reduce__(self) -> tuple:
+        return (_unwrap, (self.config,))
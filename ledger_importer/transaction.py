@@ -1,15 +1,45 @@
 from __future__ import annotations
 
 import datetime
+import sys
 from dataclasses import dataclass
 from decimal import Decimal
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def format_date(date: datetime.datetime) -> str:
+    """
+    Ledger representation of a date, statements repeat the same dates a lot.
+    """
+    return date.strftime("%Y/%m/%d")
+
+
+def intern(value: str) -> str:
+    """
+    Share the strings repeated on many rows, such as accounts and commodities.
+    """
+    return sys.intern(value) if type(value) is str else value
 
 
 @dataclass(frozen=True)
 class Amount:
+    __slots__ = ("quantity", "commodity")
+
     quantity: Decimal
     commodity: str
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "commodity", intern(self.commodity))
+
+    def __getstate__(self) -> tuple[Decimal, str]:
+        return (self.quantity, self.commodity)
+
+    def __setstate__(self, state: tuple[Decimal, str]) -> None:
+        # Frozen dataclasses can't be restored with setattr
+        object.__setattr__(self, "quantity", state[0])
+        object.__setattr__(self, "commodity", intern(state[1]))
+
     def __str__(self) -> str:
         return f"{self.quantity} {self.commodity}"
 
@@ -22,9 +52,14 @@ class Amount:
 
 @dataclass
 class Posting:
+    __slots__ = ("account", "amount")
+
     account: str
     amount: Amount
 
+    def __post_init__(self) -> None:
+        self.account = intern(self.account)
+
 
 @dataclass
 class Transaction:
@@ -32,13 +67,12 @@ class Transaction:
     Representation of a Transaction.
     """
 
+    __slots__ = ("date", "payee", "postings")
+
     date: datetime.datetime
     payee: str
     postings: list[Posting]
 
-    def to_ledger(self):
-        return (
-            f"{self.date.strftime('%Y/%m/%d')}    {self.payee}\n"
-            + "\n".join([f"    {posting.account}    {posting.amount}" for posting in self.postings])
-            + "\n"
-        )
+    def to_ledger(self) -> str:
+        postings = "".join(f"    {posting.account}    {posting.amount}\n" for posting in self.postings)
+        return f"{format_date(self.date)}    {self.payee}\n{postings}"
@@ -1,22 +1,92 @@
 from __future__ import annotations
 
+import datetime
+import heapq
+import pathlib
 import sys
+from collections import deque
+from contextlib import ExitStack
+from contextlib import closing
+from decimal import Decimal
+from typing import TYPE_CHECKING
+from typing import Deque
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
 
 import _csv
 
 from ledger_importer.config import Config
+from ledger_importer.config import compile_row_parser
+from ledger_importer.guesser import payee_tokens
+from ledger_importer.prefetch import prefetch
+from ledger_importer.schema import RowParser
+from ledger_importer.sorting import sort_transactions
+from ledger_importer.sorting import transaction_date
+from ledger_importer.statement import StatementReader
+from ledger_importer.statement import open_statement
 from ledger_importer.transaction import Amount
 from ledger_importer.transaction import Posting
 from ledger_importer.transaction import Transaction
 
+if TYPE_CHECKING:
+    from ledger_importer.checkpoint import CheckpointStore
+    from ledger_importer.fingerprint import FingerprintIndex
+    from ledger_importer.guesser import AccountGuesser
+    from ledger_importer.stats import Stats
+
+STREAMING_MATCH_WINDOW = datetime.timedelta(days=30)
+# Transactions prepared in the background while the user answers the confirmation prompts
+PREFETCH_SIZE = 64
+
 
 class TransactionsHandler:
     config: Config
+    # Number of processes used to parse the rows
+    workers: int
+    # Transactions already imported, they are skipped once merged
+    known_transactions: Optional[FingerprintIndex]
+    # Checkpoints used to only read the new rows of statements
+    checkpoints: Optional[CheckpointStore]
+    # Guesses the unknown target accounts from the payees
+    guesser: Optional[AccountGuesser]
+    # Parses a whole row at once when the config only uses a ColumnSchema
+    row_parser: Optional[RowParser]
+    # Collects counts and timings of the import when set
+    stats: Optional[Stats]
+    # Whether the confirmation was quit before the end
+    interrupted: bool = False
 
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        workers: int = 1,
+        known_transactions: Optional[FingerprintIndex] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+        guesser: Optional[AccountGuesser] = None,
+        stats: Optional[Stats] = None,
+    ) -> None:
         self.config = config
+        self.workers = workers
+        self.known_transactions = known_transactions
+        self.checkpoints = checkpoints
+        self.guesser = guesser
+        self.stats = stats
+        self.row_parser = compile_row_parser(config)
+
+        if stats is not None:
+            from ledger_importer.stats import TimedConfig
+
+            # Hooks called in worker processes are not timed
+            self.config = TimedConfig(config, stats)  # type: ignore[assignment]
+            if self.row_parser is not None:
+                self.row_parser = stats.timed("row_parser", self.row_parser)
 
     def row_to_transaction(self, row: tuple) -> Transaction:
+        if self.row_parser is not None:
+            return self.row_parser(row)
+
         return Transaction(
             date=self.config.parse_date(row),
             payee=self.config.parse_payee(row),
@@ -30,41 +100,218 @@ class TransactionsHandler:
 
         The matching is tried only on positive transactions, in this case
         it will look for older matching transactions.
+
+        Candidates are grouped by Config.transactions_match_key so that only
+        transactions sharing the same key are compared with each other.
         """
-        merged_transactions: list[Transaction] = []
+        return list(self.iter_merge_transactions(transactions, window=self.config.transactions_match_window))
+
+    def iter_merge_transactions(
+        self, transactions: Iterable[Transaction], window: Optional[datetime.timedelta] = None
+    ) -> Iterator[Transaction]:
+        """
+        Streaming version of merge_transactions.
+
+        Transactions older than the current one by more than window can't be
+        merged anymore: they are yielded and forgotten, so that memory only
+        depends on the window. Without window, everything is kept until the end.
+
+        The transactions already imported are skipped once merged, so that a transfer
+        is recognised with both its accounts, whichever statements it is read from.
+        """
+        return self.skip_known_transactions(self._iter_merge_transactions(transactions, window))
+
+    def _iter_merge_transactions(
+        self, transactions: Iterable[Transaction], window: Optional[datetime.timedelta]
+    ) -> Iterator[Transaction]:
+        candidates: dict[Hashable, Deque[Transaction]] = {}
+        pending: Deque[tuple[Transaction, Hashable]] = deque()
+        same_date: list[tuple[Transaction, Hashable]] = []
+        merged_transactions: set[int] = set()
 
         for transaction in transactions:
-            if transaction.postings[0].amount > 0:
-                for matching_transaction in transactions:
-                    if any(matching_transaction is t for t in merged_transactions):
-                        # Transaction can be merged only once
-                        continue
+            if same_date and transaction.date != same_date[0][0].date:
+                # All the candidates for the previous date are known
+                self._match_transactions(same_date, candidates, merged_transactions)
+                same_date = []
+                if window is not None:
+                    yield from self._release_transactions(
+                        pending, candidates, merged_transactions, transaction.date - window
+                    )
 
-                    if matching_transaction.date > transaction.date:
-                        # Nothing was found up to the current transaction
-                        break
+            key = self.config.transactions_match_key(transaction)
+            candidates.setdefault(key, deque()).append(transaction)
+            pending.append((transaction, key))
+            same_date.append((transaction, key))
 
-                    if self.config.transactions_match(transaction, matching_transaction):
-                        transaction.postings[1].account = matching_transaction.postings[0].account
-                        merged_transactions.append(matching_transaction)
-                        break
+        self._match_transactions(same_date, candidates, merged_transactions)
+        yield from self._release_transactions(pending, candidates, merged_transactions, None)
 
-        return [transaction for transaction in transactions if not any(transaction is t for t in merged_transactions)]
+    def _match_transactions(
+        self,
+        transactions: list[tuple[Transaction, Hashable]],
+        candidates: dict[Hashable, Deque[Transaction]],
+        merged_transactions: set[int],
+    ) -> None:
+        for transaction, key in transactions:
+            if not transaction.postings[0].amount > 0:
+                continue
+
+            bucket = candidates[key]
+            while bucket and id(bucket[0]) in merged_transactions:
+                bucket.popleft()
+
+            for matching_transaction in bucket:
+                if matching_transaction.date > transaction.date:
+                    # Nothing was found up to the current transaction
+                    break
+
+                if id(matching_transaction) in merged_transactions:
+                    # Transaction can be merged only once
+                    continue
+
+                if self.config.transactions_match(transaction, matching_transaction):
+                    transaction.postings[1].account = matching_transaction.postings[0].account
+                    merged_transactions.add(id(matching_transaction))
+                    if self.stats is not None:
+                        self.stats.count("transactions_merged")
+                    break
+
+    @staticmethod
+    def _release_transactions(
+        pending: Deque[tuple[Transaction, Hashable]],
+        candidates: dict[Hashable, Deque[Transaction]],
+        merged_transactions: set[int],
+        before: Optional[datetime.datetime],
+    ) -> Iterator[Transaction]:
+        while pending and (before is None or pending[0][0].date < before):
+            transaction, key = pending.popleft()
+
+            bucket = candidates[key]
+            if bucket and bucket[0] is transaction:
+                bucket.popleft()
+            if not bucket:
+                del candidates[key]
+
+            if id(transaction) in merged_transactions:
+                merged_transactions.remove(id(transaction))
+            else:
+                yield transaction
+
+    def iter_transactions(self, csv_reader: _csv._reader) -> Iterator[Transaction]:
+        """
+        Parse transactions from the csv reader, in the order of the statement.
+        """
+        for _ in range(self.config.skip_lines):
+            next(csv_reader)
+
+        rows: Iterable = csv_reader
+        if self.stats is not None:
+            rows = self.stats.count_iter("rows_read", rows)
+
+        transactions: Iterable[Transaction]
+        if self.workers > 1 and self.stats is None and isinstance(csv_reader, StatementReader):
+            from ledger_importer.parallel import parse_chunks
+
+            # The chunks decoded by the reader are sent as is to the workers
+            transactions = parse_chunks(self.config, csv_reader.iter_chunks(), self.workers)
+        elif self.workers > 1:
+            from ledger_importer.parallel import parse_rows
+
+            transactions = parse_rows(self.config, rows, self.workers)
+        else:
+            transactions = (self.row_to_transaction(tuple(row)) for row in rows)
+
+        if self.stats is not None:
+            transactions = self.stats.count_iter("transactions_parsed", transactions)
+
+        yield from self.guess_accounts(transactions)
+
+    def skip_known_transactions(self, transactions: Iterable[Transaction]) -> Iterator[Transaction]:
+        """
+        Skip the transactions that were already imported.
+        """
+        if not self.known_transactions:
+            yield from transactions
+            return
+
+        yield from self.known_transactions.skip_known(transactions)
+
+    def guess_accounts(self, transactions: Iterable[Transaction]) -> Iterator[Transaction]:
+        """
+        Replace the unknown target account of the transactions by the guess of the guesser, when it has one.
+
+        The accounts chosen by the config, like the ones of its rules, are kept.
+        """
+        if self.guesser is None:
+            yield from transactions
+            return
+
+        unknown_accounts = frozenset(self.config.unknown_accounts)
+        for transaction in transactions:
+            if len(transaction.postings) > 1 and transaction.postings[1].account in unknown_accounts:
+                account = self.guesser.guess(transaction.payee)
+                if account and account != transaction.postings[0].account:
+                    transaction.postings[1].account = account
+            yield transaction
 
     def parse_transactions(self, csv_reader: _csv._reader) -> list[Transaction]:
         """
         Parse transactions from the csv reader and sort them chronologically.
         """
-        transactions: list[Transaction] = []
+        return sorted(self.iter_transactions(csv_reader), key=transaction_date)
 
-        for _ in range(self.config.skip_lines):
-            next(csv_reader)
+    def stream_transactions(self, csv_reader: _csv._reader) -> Iterator[Transaction]:
+        """
+        Streaming version of merge_transactions(parse_transactions(csv_reader)).
+
+        Memory doesn't depend on the size of the statement: transactions are
+        sorted with an external merge sort and merged in a sliding window of
+        Config.transactions_match_window (STREAMING_MATCH_WINDOW when unset).
+        """
+        return self.iter_merge_transactions(
+            sort_transactions(self.iter_transactions(csv_reader)),
+            window=self.config.transactions_match_window or STREAMING_MATCH_WINDOW,
+        )
+
+    def parse_statements(self, statement_paths: list[pathlib.Path]) -> list[Transaction]:
+        """
+        Parse and sort each statement on its own, then merge them chronologically.
+
+        With several workers, the statements are parsed in parallel.
+        """
+        statements_transactions: list[list[Transaction]]
+        if self.workers > 1 and len(statement_paths) > 1 and not self.checkpoints:
+            from ledger_importer.parallel import parse_statements
+
+            statements_transactions = [
+                list(self.guess_accounts(transactions))
+                for transactions in parse_statements(self.config, statement_paths, self.workers)
+            ]
+        else:
+            statements_transactions = []
+            for statement_path in statement_paths:
+                with open_statement(statement_path, self.config, self.checkpoints) as csv_reader:
+                    statements_transactions.append(self.parse_transactions(csv_reader))
 
-        for row in csv_reader:
-            transaction = self.row_to_transaction(tuple(row))
-            transactions.append(transaction)
+        return list(heapq.merge(*statements_transactions, key=transaction_date))
 
-        return sorted(transactions, key=lambda transaction: transaction.date)
+    def stream_statements(self, statement_paths: list[pathlib.Path]) -> Iterator[Transaction]:
+        """
+        Streaming version of merge_transactions(parse_statements(statement_paths)).
+        """
+        with ExitStack() as stack:
+            csv_readers = [
+                stack.enter_context(open_statement(statement_path, self.config, self.checkpoints))
+                for statement_path in statement_paths
+            ]
+            yield from self.iter_merge_transactions(
+                heapq.merge(
+                    *(sort_transactions(self.iter_transactions(csv_reader)) for csv_reader in csv_readers),
+                    key=transaction_date,
+                ),
+                window=self.config.transactions_match_window or STREAMING_MATCH_WINDOW,
+            )
 
     def confirm_transactions(self, transactions: list[Transaction]) -> list[Transaction]:
         """
@@ -72,49 +319,142 @@ class TransactionsHandler:
 
         Returns only confirmed transactions.
         """
-        confirmed_transactions: list[Transaction] = []
+        return list(self.iter_confirm_transactions(transactions))
 
-        for transaction in transactions:
-            print(
-                f"""
-| {"Account".center(max(len(transaction.postings[0].account), len("Account")))} | {"Date".center(10)} | {"Amount".center(max(len(str(transaction.postings[0].amount)), len("Amount")))} | {"Payee".center(max(len(transaction.payee), len("Payee")))} |
-| {transaction.postings[0].account} | {transaction.date.strftime("%Y/%m/%d")} | {transaction.postings[0].amount} | {transaction.payee} |
-    """,
-                file=sys.stderr,
-            )
+    def confirm_grouped_transactions(self, transactions: list[Transaction]) -> list[Transaction]:
+        """
+        Manually confirm the transactions using the cli, answering once for each group
+        of transactions sharing the same group_key.
 
-            if transaction.postings[0].amount.quantity > 0:
-                print(
-                    f"""Which account provided this income? ([{transaction.postings[1].account}]/[q]uit/[s]kip) """,
-                    file=sys.stderr,
-                )
-            else:
-                print(
-                    f"""To which account did this money go? ([{transaction.postings[1].account}]/[q]uit/[s]kip) """,
-                    file=sys.stderr,
-                )
+        Groups are asked in the order of their first transaction, [e]xpand asks for
+        each transaction of the group instead.
 
-            answer = input()
+        Returns only confirmed transactions, in their original order.
+        """
+        groups: dict[Hashable, list[int]] = {}
+        for index, transaction in enumerate(transactions):
+            groups.setdefault(self.group_key(transaction), []).append(index)
+
+        confirmed: dict[int, Transaction] = {}
+        for index, answer in self._group_answers(transactions, groups.values()):
             if answer == "q":
+                self.interrupted = True
                 break
             elif answer == "s":
                 continue
 
-            if answer:
-                transaction = Transaction(
-                    date=transaction.date,
-                    payee=transaction.payee,
-                    postings=[
-                        transaction.postings[0],
-                        Posting(
-                            account=answer,
-                            amount=Amount(
-                                quantity=transaction.postings[1].amount.quantity,
-                                commodity=transaction.postings[1].amount.commodity,
-                            ),
+            confirmed[index] = self.answer_transaction(transactions[index], answer)
+
+        return [confirmed[index] for index in sorted(confirmed)]
+
+    def _group_answers(self, transactions: list[Transaction], groups: Iterable[list[int]]) -> Iterator[tuple[int, str]]:
+        for indexes in groups:
+            if len(indexes) > 1:
+                print(self.render_group_prompt([transactions[index] for index in indexes]), file=sys.stderr)
+                answer = input()
+                if answer != "e":
+                    for index in indexes:
+                        yield index, answer
+                    continue
+
+            for index in indexes:
+                print(self.render_prompt(transactions[index]), file=sys.stderr)
+                yield index, input()
+
+    @staticmethod
+    def group_key(transaction: Transaction) -> Hashable:
+        """
+        Transactions with the same payee words, suggested account, commodity and direction are confirmed together.
+        """
+        amount = transaction.postings[0].amount
+        return (
+            tuple(payee_tokens(transaction.payee)) or transaction.payee.casefold().strip(),
+            transaction.postings[1].account,
+            amount.commodity,
+            amount.quantity > 0,
+        )
+
+    @staticmethod
+    def _question(transaction: Transaction) -> str:
+        if transaction.postings[0].amount.quantity > 0:
+            return "Which account provided this income?"
+        return "To which account did this money go?"
+
+    def render_prompt(self, transaction: Transaction) -> str:
+        """
+        Text shown to the user to confirm the transaction, with the suggested target account.
+        """
+        return (
+            f"""
+| {"Account".center(max(len(transaction.postings[0].account), len("Account")))} | {"Date".center(10)} | {"Amount".center(max(len(str(transaction.postings[0].amount)), len("Amount")))} | {"Payee".center(max(len(transaction.payee), len("Payee")))} |
+| {transaction.postings[0].account} | {transaction.date.strftime("%Y/%m/%d")} | {transaction.postings[0].amount} | {transaction.payee} |
+"""
+            f"    \n{self._question(transaction)} ([{transaction.postings[1].account}]/[q]uit/[s]kip) "
+        )
+
+    def render_group_prompt(self, transactions: list[Transaction]) -> str:
+        """
+        Text shown to the user to confirm a group of transactions at once.
+        """
+        first = transactions[0]
+        payee = first.payee
+        count = str(len(transactions))
+        total = str(
+            Amount(
+                quantity=sum((transaction.postings[0].amount.quantity for transaction in transactions), Decimal(0)),
+                commodity=first.postings[0].amount.commodity,
+            )
+        )
+        dates = f"{first.date.strftime('%Y/%m/%d')} - {transactions[-1].date.strftime('%Y/%m/%d')}"
+        return (
+            f"""
+| {"Payee".center(max(len(payee), len("Payee")))} | {"Count".center(max(len(count), len("Count")))} | {"Total".center(max(len(total), len("Total")))} | {"Dates".center(len(dates))} |
+| {payee} | {count.rjust(len("Count"))} | {total} | {dates} |
+"""
+            f"    \n{self._question(first)} ([{first.postings[1].account}]/[q]uit/[s]kip/[e]xpand) "
+        )
+
+    def answer_transaction(self, transaction: Transaction, answer: str) -> Transaction:
+        """
+        Confirm the transaction with the target account answered, the suggested one when empty.
+        """
+        if answer:
+            transaction = Transaction(
+                date=transaction.date,
+                payee=transaction.payee,
+                postings=[
+                    transaction.postings[0],
+                    Posting(
+                        account=answer,
+                        amount=Amount(
+                            quantity=transaction.postings[1].amount.quantity,
+                            commodity=transaction.postings[1].amount.commodity,
                         ),
-                    ],
-                )
-            confirmed_transactions.append(transaction)
+                    ),
+                ],
+            )
+        return transaction
+
+    def iter_confirm_transactions(self, transactions: Iterable[Transaction]) -> Iterator[Transaction]:
+        """
+        Streaming version of confirm_transactions.
+
+        The next transactions are pulled from transactions (parsed, merged and guessed
+        when streaming) and their prompts rendered in a background thread, while the
+        user answers the current prompt.
+        """
+        prompts = prefetch(
+            ((transaction, self.render_prompt(transaction)) for transaction in transactions), PREFETCH_SIZE
+        )
+        with closing(prompts):
+            for transaction, prompt in prompts:
+                print(prompt, file=sys.stderr)
+
+                answer = input()
+                if answer == "q":
+                    self.interrupted = True
+                    break
+                elif answer == "s":
+                    continue
 
-        return confirmed_transactions
+                yield self.answer_transaction(transaction, answer)
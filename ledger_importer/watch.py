@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import ctypes
+import fnmatch
+import os
+import pathlib
+import select
+import signal
+import struct
+import sys
+import time
+from abc import ABC
+from abc import abstractmethod
+from typing import Optional
+
+from ledger_importer.cache import FileStamp
+from ledger_importer.importer import Importer
+
+# inotify(7) events of a file created, written or moved into the watched directory
+IN_MODIFY = 0x2
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class Watcher(ABC):
+    """
+    Source of the files of a directory that may have changed.
+    """
+
+    def __init__(self, directory: pathlib.Path) -> None:
+        self.directory = directory
+
+    @abstractmethod
+    def changes(self, timeout: Optional[float]) -> set[pathlib.Path]:
+        """
+        Wait up to timeout seconds (forever when None) for changes and return the changed files.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class PollingWatcher(Watcher):
+    """
+    Watcher comparing the size and modification time of the files of the directory every interval seconds.
+    """
+
+    def __init__(self, directory: pathlib.Path, interval: float = 1.0) -> None:
+        super().__init__(directory)
+        self.interval = interval
+        self.stamps = self.scan()
+
+    def scan(self) -> dict[pathlib.Path, FileStamp]:
+        stamps = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        stamps[pathlib.Path(entry.path)] = FileStamp(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                except FileNotFoundError:
+                    continue
+        return stamps
+
+    def changes(self, timeout: Optional[float]) -> set[pathlib.Path]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        stamps = self.scan()
+        changed = {path for path, stamp in stamps.items() if self.stamps.get(path) != stamp}
+        self.stamps = stamps
+        return changed
+
+
+class InotifyWatcher(Watcher):
+    """
+    Watcher notified by the kernel through inotify(7), Linux only.
+    """
+
+    def __init__(self, directory: pathlib.Path) -> None:
+        super().__init__(directory)
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"Can't watch {directory}")
+
+    def changes(self, timeout: Optional[float]) -> set[pathlib.Path]:
+        changed: set[pathlib.Path] = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        while readable:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, _, _, name_size = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = data[offset : offset + name_size].rstrip(b"\0")
+                offset += name_size
+                if name:
+                    changed.add(self.directory / os.fsdecode(name))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def open_watcher(directory: pathlib.Path, poll_interval: float = 1.0, polling: bool = False) -> Watcher:
+    """
+    Watch the directory with inotify when available, by polling otherwise.
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            # No inotify in the libc or no more watches available
+            pass
+    return PollingWatcher(directory, poll_interval)
+
+
+class FolderImporter:
+    """
+    Import the statements of a directory when they are created or grow.
+
+    A statement is imported once it kept the same size and modification time for
+    settle seconds, so that files still being written are not read. The rows read
+    are recorded by the checkpoints of the importer, so that only new rows are
+    imported, also after a restart. Transactions are appended to the journal, or
+    inserted at their date with insert.
+    """
+
+    def __init__(
+        self,
+        importer: Importer,
+        watcher: Watcher,
+        pattern: str = "*.csv",
+        settle: float = 2.0,
+        insert: bool = False,
+    ) -> None:
+        self.importer = importer
+        self.watcher = watcher
+        self.pattern = pattern
+        self.settle = settle
+        self.insert = insert
+        # Statements waiting to settle, with their stamp and when they were last seen changing
+        self.pending: dict[pathlib.Path, tuple[FileStamp, float]] = {}
+
+    def matches(self, path: pathlib.Path) -> bool:
+        # Hidden files are usually temporary files of a download or a sync
+        return not path.name.startswith(".") and fnmatch.fnmatch(path.name, self.pattern)
+
+    def mark(self, path: pathlib.Path, now: float) -> None:
+        if not self.matches(path):
+            return
+        try:
+            self.pending[path] = (FileStamp.of(path), now)
+        except FileNotFoundError:
+            self.pending.pop(path, None)
+
+    def mark_all(self, now: float) -> None:
+        """
+        Mark every statement of the directory, to import the rows added while not watching.
+        """
+        for path in sorted(self.watcher.directory.iterdir()):
+            if path.is_file():
+                self.mark(path, now)
+
+    def ready(self, now: float) -> list[pathlib.Path]:
+        """
+        Pop the statements that didn't change for settle seconds.
+        """
+        ready = []
+        for path, (stamp, since) in list(self.pending.items()):
+            if now - since < self.settle:
+                continue
+            try:
+                current = FileStamp.of(path)
+            except FileNotFoundError:
+                del self.pending[path]
+                continue
+            if current == stamp:
+                del self.pending[path]
+                ready.append(path)
+            else:
+                # Written to without notification, wait again
+                self.pending[path] = (current, now)
+        return sorted(ready)
+
+    def step(self) -> list[pathlib.Path]:
+        """
+        Wait for changes, then import the statements that settled and return them.
+        """
+        now = time.monotonic()
+        timeout = None
+        if self.pending:
+            timeout = max(0.0, min(since for _, since in self.pending.values()) + self.settle - now)
+
+        for path in self.watcher.changes(timeout):
+            self.mark(path, time.monotonic())
+
+        ready = self.ready(time.monotonic())
+        for statement_path in ready:
+            try:
+                transactions = self.importer.import_transactions(
+                    [statement_path], append=not self.insert, insert=self.insert
+                )
+            except Exception as e:
+                # Keep watching, the statement is imported again when it changes
+                print(f"Can't import {statement_path}: {e!r}", file=sys.stderr)
+                continue
+            if transactions:
+                print(f"Imported {len(transactions)} transactions from {statement_path}", file=sys.stderr)
+        return ready
+
+    def run(self) -> None:
+        """
+        Import the statements of the directory until interrupted.
+        """
+        # Stopping the service ends the current import first
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        self.mark_all(time.monotonic() - self.settle)
+        try:
+            while True:
+                self.step()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.watcher.close()
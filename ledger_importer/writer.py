@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import datetime
+import io
+import os
+import pathlib
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+from ledger_importer.cache import open_atomically
+from ledger_importer.journal import TRANSACTION_LINE
+from ledger_importer.transaction import Transaction
+from ledger_importer.transaction import format_date
+
+# Characters starting a comment line in a journal
+COMMENT_CHARS = ";#%|*"
+# Date of the transaction headers of a journal
+HEADER_DATE = re.compile(r"^(\d{4})[/-](\d{1,2})[/-](\d{1,2})", re.MULTILINE)
+# Size of the journal chunks read by merge_into_journal
+MERGE_CHUNK_SIZE = 1 << 20
+# Size of the blocks copied from the buffered transactions to the journal
+COPY_SIZE = 8 * 1024 * 1024
+
+
+class LedgerWriter:
+    """
+    Render transactions to a text output, separated by an empty line.
+
+    With align_column, amounts are right-aligned to end at that column.
+    """
+
+    def __init__(self, output: IO[str], align_column: int = 0) -> None:
+        self.output = output
+        self.align_column = align_column
+        self.count = 0
+
+    def render(self, transaction: Transaction) -> str:
+        if not self.align_column:
+            return transaction.to_ledger()
+
+        lines = [f"{format_date(transaction.date)}    {transaction.payee}\n"]
+        for posting in transaction.postings:
+            account = f"    {posting.account}"
+            amount = str(posting.amount)
+            lines.append(f"{account}{' ' * max(self.align_column - len(account) - len(amount), 4)}{amount}\n")
+        return "".join(lines)
+
+    def write(self, transaction: Transaction) -> None:
+        self.output.write(self.render(transaction))
+        self.output.write("\n")
+        self.count += 1
+
+    def write_all(self, transactions: Iterable[Transaction]) -> None:
+        for transaction in transactions:
+            self.write(transaction)
+
+
+@contextmanager
+def append_to_journal(journal_path: pathlib.Path, align_column: int = 0) -> Iterator[LedgerWriter]:
+    """
+    Writer appending to a journal once all the transactions are written.
+
+    Transactions are buffered in a temporary file, and only appended to the
+    journal and fsync'd when the block exits without error, so that an
+    interrupted import doesn't leave a half-written journal.
+    """
+    with tempfile.TemporaryFile() as buffer:
+        output = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+        writer = LedgerWriter(output, align_column=align_column)
+        yield writer
+        output.flush()
+        output.detach()
+
+        if not writer.count:
+            return
+
+        buffer.seek(0)
+        with journal_path.open("ab") as journal_file:
+            if journal_file.tell() and not ends_with_newline(journal_path):
+                journal_file.write(b"\n")
+            shutil.copyfileobj(buffer, journal_file, COPY_SIZE)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+
+@contextmanager
+def insert_into_journal(journal_path: pathlib.Path, align_column: int = 0) -> Iterator[LedgerWriter]:
+    """
+    Writer inserting transactions into a journal at their date once all the transactions are written.
+
+    Transactions must be written sorted by date. They are buffered like with
+    append_to_journal, then merged with the journal in one pass: each one is
+    inserted before the first transaction of the journal with a later date.
+    The merged journal replaces the journal only once fully written.
+    """
+    with tempfile.TemporaryFile() as buffer:
+        output = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+        writer = LedgerWriter(output, align_column=align_column)
+        yield writer
+        output.flush()
+        output.detach()
+
+        if not writer.count:
+            return
+
+        buffer.seek(0)
+        # Bytes that aren't utf-8 are written back as they were read
+        entries = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+        with journal_path.open(encoding="utf-8", errors="surrogateescape", newline="") as journal_file:
+            with open_atomically(journal_path) as merged_file:
+                merged = io.TextIOWrapper(merged_file, encoding="utf-8", errors="surrogateescape", newline="")
+                merge_into_journal(journal_file, iter_entries(entries), merged)
+                merged.flush()
+                merged.detach()
+        entries.detach()
+
+
+def header_date(line: str) -> Optional[datetime.date]:
+    m = TRANSACTION_LINE.match(line)
+    if not m:
+        return None
+    year, month, day, _ = m.groups()
+    try:
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def iter_entries(lines: Iterable[str]) -> Iterator[tuple[datetime.date, str]]:
+    """
+    Read back the transactions rendered by a LedgerWriter, with their date.
+    """
+    date: Optional[datetime.date] = None
+    entry: list[str] = []
+    for line in lines:
+        if date is None:
+            date = header_date(line)
+        entry.append(line)
+        if line == "\n" and date is not None:
+            yield date, "".join(entry)
+            date, entry = None, []
+
+
+def comments_start(text: str, position: int) -> int:
+    """
+    Start of the comment lines right above the line starting at position.
+    """
+    while position:
+        start = text.rfind("\n", 0, position - 1) + 1
+        if text[start] not in COMMENT_CHARS:
+            break
+        position = start
+    return position
+
+
+def merge_into_journal(journal_file: IO[str], entries: Iterable[tuple[datetime.date, str]], output: IO[str]) -> None:
+    """
+    Write the journal merged with the dated entries, sorted by date, to output.
+
+    An entry goes before the first transaction dated after it, and before the
+    comment lines right above that transaction. Other lines are kept as they are.
+
+    The journal is read by chunks of complete lines in which only the transaction
+    headers are looked at, the text between two insertions is copied at once.
+    """
+    pending = iter(entries)
+    entry = next(pending, None)
+    carry = ""
+    tail = "\n"
+    last_header = ""
+    date: Optional[datetime.date] = None
+    end_of_file = False
+    while entry is not None and not end_of_file:
+        data = journal_file.read(MERGE_CHUNK_SIZE)
+        end_of_file = not data
+        text, carry = carry + data, ""
+        if not end_of_file:
+            # Incomplete last line and the comments above it wait for the next chunk,
+            # unless the comments are longer than a chunk
+            end = text.rfind("\n") + 1
+            if end - comments_start(text, end) < MERGE_CHUNK_SIZE:
+                end = comments_start(text, end)
+            text, carry = text[:end], text[end:]
+
+        position = 0
+        for m in HEADER_DATE.finditer(text):
+            # Transactions of a same day usually follow each other
+            if m.group() != last_header:
+                last_header = m.group()
+                try:
+                    date = datetime.date(*map(int, m.groups()))
+                except ValueError:
+                    date = None
+            if date is None or entry[0] >= date:
+                continue
+            start = comments_start(text, m.start())
+            output.write(text[position:start])
+            position = start
+            while entry is not None and entry[0] < date:
+                output.write(entry[1])
+                entry = next(pending, None)
+            if entry is None:
+                break
+        output.write(text[position:])
+        tail = text or tail
+
+    output.write(carry)
+    if entry is None:
+        # Everything was inserted, the rest of the journal is copied as is
+        shutil.copyfileobj(journal_file, output, MERGE_CHUNK_SIZE)
+        return
+
+    if not tail.endswith("\n"):
+        output.write("\n")
+    output.write(entry[1])
+    for _, text in pending:
+        output.write(text)
+
+
+def ends_with_newline(path: pathlib.Path) -> bool:
+    with path.open("rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
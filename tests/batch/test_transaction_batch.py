@@ -0,0 +1,33 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from ledger_importer.batch import TransactionBatch
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+
+
+def test_batch_returns_the_stored_transactions():
+    transactions = [
+        Transaction(
+            date=datetime.datetime(year=2021, month=1, day=day),
+            payee=f"Payee {day}",
+            postings=[
+                Posting(account="Assets:Checking", amount=Amount(quantity=Decimal(-day), commodity="€")),
+                Posting(account="Expenses", amount=Amount(quantity=Decimal(day), commodity="€")),
+            ][: day % 3],
+        )
+        for day in range(1, 10)
+    ]
+
+    batch = TransactionBatch(transactions)
+
+    assert len(batch) == 9
+    assert list(batch) == transactions
+    assert batch[-1] == transactions[-1]
+    with pytest.raises(IndexError):
+        batch[9]
+    with pytest.raises(IndexError):
+        batch[-10]
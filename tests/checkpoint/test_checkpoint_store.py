@@ -0,0 +1,45 @@
+import pytest
+
+from ledger_importer.checkpoint import CheckpointStore
+from ledger_importer.transactions_handler import TransactionsHandler
+
+
+@pytest.fixture
+def statement_path(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text("date,payee,amount\n05-20-2021,Salary,2000\n05-23-2021,Groceries,-42.5\n")
+    yield path
+
+
+def import_payees(config, statement_path, directory):
+    checkpoints = CheckpointStore(config, directory=directory)
+    transactions = TransactionsHandler(config, checkpoints=checkpoints).parse_statements([statement_path])
+    checkpoints.save()
+    return [transaction.payee for transaction in transactions]
+
+
+def test_only_appended_rows_are_imported(config, statement_path, tmp_path):
+    assert import_payees(config, statement_path, tmp_path / "checkpoints") == ["Salary", "Groceries"]
+
+    with statement_path.open("a") as statement_file:
+        statement_file.write("05-25-2021,Rent,-800\n")
+
+    assert import_payees(config, statement_path, tmp_path / "checkpoints") == ["Rent"]
+    assert import_payees(config, statement_path, tmp_path / "checkpoints") == []
+
+
+def test_rewritten_statement_is_imported_again(config, statement_path, tmp_path):
+    import_payees(config, statement_path, tmp_path / "checkpoints")
+
+    statement_path.write_text("date,payee,amount\n05-20-2021,Salary,2000\n05-23-2021,Restaurant,-42.5\n")
+
+    assert import_payees(config, statement_path, tmp_path / "checkpoints") == ["Salary", "Restaurant"]
+
+
+def test_checkpoints_are_kept_per_config(config, statement_path, tmp_path):
+    class OtherConfig(type(config)):
+        pass
+
+    import_payees(config, statement_path, tmp_path / "checkpoints")
+
+    assert import_payees(OtherConfig(), statement_path, tmp_path / "checkpoints") == ["Salary", "Groceries"]
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from ledger_importer.__main__ import app
+
+CONFIGS = """
+import datetime
+from decimal import Decimal
+
+from ledger_importer import Amount
+from ledger_importer import Config
+from ledger_importer import Posting
+
+
+class BankA(Config):
+    account = "Assets:BankA"
+    date_format = "%m-%d-%Y"
+
+    def parse_date(self, fields):
+        return datetime.datetime.strptime(fields[0], self.date_format)
+
+    def parse_payee(self, fields):
+        return fields[1]
+
+    def parse_postings(self, fields):
+        return [
+            Posting(account=self.account, amount=Amount(quantity=Decimal(fields[2]), commodity="€")),
+            Posting(account="Expenses", amount=Amount(quantity=-Decimal(fields[2]), commodity="€")),
+        ]
+
+
+class BankB(BankA):
+    account = "Assets:BankB"
+    date_format = "%Y-%m-%d"
+"""
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    (tmp_path / "batch_configs.py").write_text(CONFIGS)
+    (tmp_path / "a.csv").write_text("date,payee,amount\n05-20-2021,Transfer to B,-100\n05-22-2021,Groceries,-42.5\n")
+    (tmp_path / "b.csv").write_text("date,payee,amount\n2021-05-19,Salary,2000\n2021-05-20,Transfer from A,100\n")
+    path = tmp_path / "manifest.json"
+    path.write_text(
+        json.dumps(
+            {
+                "statements": [
+                    {"statement_path": "a.csv", "config_path": "batch_configs.py::BankA"},
+                    {"statement_path": "b.csv", "config_path": "batch_configs.py::BankB"},
+                ]
+            }
+        )
+    )
+    yield path
+
+
+EXPECTED_OUTPUT = (
+    "2021/05/19    Salary\n    Assets:BankB    2000 €\n    Expenses    -2000 €\n\n"
+    "2021/05/20    Transfer from A\n    Assets:BankB    100 €\n    Assets:BankA    -100 €\n\n"
+    "2021/05/22    Groceries\n    Assets:BankA    -42.5 €\n    Expenses    42.5 €\n\n"
+)
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_transfers_between_statements_are_merged(manifest_path, workers):
+    result = CliRunner().invoke(app, ["import-batch", str(manifest_path), "--quiet", "--workers", workers])
+
+    assert result.exit_code == 0, result.output
+    assert result.output == EXPECTED_OUTPUT
+
+
+def test_statements_are_parsed_in_spawned_workers(manifest_path, spawn):
+    result = CliRunner().invoke(app, ["import-batch", str(manifest_path), "--quiet", "--workers", "2"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output == EXPECTED_OUTPUT
+
+
+def test_invalid_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text('{"statements": []}')
+
+    result = CliRunner().invoke(app, ["import-batch", str(manifest_path), "--quiet"])
+
+    assert result.exit_code == 2
+    assert "Invalid manifest" in result.output
+
+
+def test_reimported_transfers_are_skipped(manifest_path, tmp_path):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text(EXPECTED_OUTPUT)
+
+    result = CliRunner().invoke(
+        app,
+        ["import-batch", str(manifest_path), "--quiet", "--journal-path", str(journal_path), "--skip-imported"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.output == ""
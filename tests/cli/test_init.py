@@ -0,0 +1,22 @@
+from decimal import Decimal
+
+from typer.testing import CliRunner
+
+from ledger_importer.__main__ import app
+from ledger_importer.__main__ import load_config
+from ledger_importer.transactions_handler import TransactionsHandler
+
+
+def test_sample_config_parses_rows(tmp_path):
+    result = CliRunner().invoke(app, ["init"])
+    assert result.exit_code == 0, result.output
+    (tmp_path / "sample_config.py").write_text(result.output)
+
+    config = load_config(f"{tmp_path}/sample_config.py::LedgerImporterConfig")
+    transaction = TransactionsHandler(config).row_to_transaction(("05-23-2021", "", "Groceries", "-42,50"))
+
+    assert transaction.payee == "Groceries"
+    assert [(posting.account, posting.amount.quantity) for posting in transaction.postings] == [
+        ("Assets:Checking", Decimal("-42.50")),
+        ("Expenses", Decimal("42.50")),
+    ]
@@ -0,0 +1,85 @@
+import sys
+
+import pytest
+import typer
+
+from ledger_importer.__main__ import load_config
+from ledger_importer.parallel import parse_rows
+
+CONFIG = """
+import datetime
+
+from ledger_importer import Config
+
+
+class MyConfig(Config):
+    skip_lines = 2
+
+    def parse_date(self, fields):
+        return datetime.datetime.strptime(fields[0], "%Y-%m-%d")
+
+    def parse_payee(self, fields):
+        return fields[1]
+
+    def parse_postings(self, fields):
+        return []
+"""
+
+
+def test_config_is_loaded_from_its_file_without_changing_sys_path(tmp_path):
+    (tmp_path / "my_ledger_config.py").write_text(CONFIG)
+    sys_path = list(sys.path)
+
+    config = load_config(f"{tmp_path}/my_ledger_config.py::MyConfig")
+
+    assert config.skip_lines == 2
+    assert type(config).__module__.startswith("_ledger_importer_config_my_ledger_config_")
+    assert "my_ledger_config" not in sys.modules
+    assert sys.path == sys_path
+
+
+def test_config_can_import_the_modules_next_to_it(tmp_path):
+    (tmp_path / "my_ledger_helpers.py").write_text("SKIP_LINES = 3\n")
+    (tmp_path / "my_ledger_config.py").write_text(
+        CONFIG
+        + "\n\nfrom my_ledger_helpers import SKIP_LINES\n\n\nclass HelpedConfig(MyConfig):\n    skip_lines = SKIP_LINES\n"
+    )
+    sys_path = list(sys.path)
+
+    config = load_config(f"{tmp_path}/my_ledger_config.py::HelpedConfig")
+
+    assert config.skip_lines == 3
+    assert sys.path == sys_path
+
+
+def test_config_path_can_omit_the_extension(tmp_path):
+    (tmp_path / "my_ledger_config.py").write_text(CONFIG)
+
+    assert load_config(f"{tmp_path}/my_ledger_config::MyConfig").skip_lines == 2
+
+
+def test_missing_config_file_is_a_bad_parameter(tmp_path):
+    with pytest.raises(typer.BadParameter):
+        load_config(f"{tmp_path}/missing.py::MyConfig")
+
+
+def test_configs_of_a_same_file_share_their_module(tmp_path):
+    (tmp_path / "my_ledger_config.py").write_text(CONFIG + "\n\nclass OtherConfig(MyConfig):\n    skip_lines = 3\n")
+
+    config = load_config(f"{tmp_path}/my_ledger_config.py::MyConfig")
+    other_config = load_config(f"{tmp_path}/my_ledger_config.py::OtherConfig")
+
+    assert isinstance(other_config, type(config))
+    assert sys.modules[type(config).__module__].OtherConfig is type(other_config)
+
+
+def test_config_is_rebuilt_from_its_file_in_spawned_workers(tmp_path, spawn, capsys):
+    (tmp_path / "my_ledger_config.py").write_text(CONFIG)
+    config = load_config(f"{tmp_path}/my_ledger_config.py::MyConfig")
+    config.skip_lines = 0
+    rows = [(f"2021-05-{day:02}", f"payee {day}") for day in range(1, 29)]
+
+    transactions = list(parse_rows(config, rows, workers=2, chunk_size=10))
+
+    assert [transaction.payee for transaction in transactions] == [f"payee {day}" for day in range(1, 29)]
+    assert capsys.readouterr().err == ""
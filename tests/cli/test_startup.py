@@ -0,0 +1,11 @@
+import subprocess
+import sys
+
+
+def test_cli_doesnt_import_the_interactive_modules():
+    code = "import sys, ledger_importer.__main__; print(sorted(sys.modules))"
+
+    modules = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+    assert "ledger_importer.completion" not in modules
+    assert "readline" not in modules
@@ -0,0 +1,37 @@
+import pickle
+from decimal import Decimal
+
+import pytest
+
+from ledger_importer.rules import Rule
+from ledger_importer.transaction import Amount
+
+
+@pytest.fixture
+def rules_config(config):
+    config.rules = [
+        Rule("SALARY", "Income:Salary", literal=True),
+        Rule("RESTAURANT|CAFE", "Expenses:Restaurant", max_amount=Decimal("0")),
+    ]
+    yield config
+
+
+def test_account_of_the_matching_rule(rules_config):
+    config = rules_config
+
+    assert config.match_account("SALARY ACME") == "Income:Salary"
+    assert config.match_account("CAFE DE FLORE", Amount(quantity=Decimal("-4"), commodity="€")) == "Expenses:Restaurant"
+
+
+def test_default_account_when_no_rule_matches(rules_config):
+    config = rules_config
+
+    assert config.match_account("CAFE DE FLORE", Amount(quantity=Decimal("4"), commodity="€"), "Income") == "Income"
+    assert config.match_account("SNCF") is None
+
+
+def test_compiled_rules_can_be_pickled(rules_config):
+    config = rules_config
+    config.match_account("SALARY ACME")
+
+    assert pickle.loads(pickle.dumps(config)).match_account("SALARY ACME") == "Income:Salary"
@@ -1,4 +1,5 @@
 import datetime
+import multiprocessing
 from decimal import Decimal
 from unittest import mock
 
@@ -31,4 +32,17 @@ def config():
 
 @pytest.fixture
 def transactions_handler():
-    yield TransactionsHandler(mock.MagicMock())
+    config = mock.MagicMock()
+    config.transactions_match_window = None
+    yield TransactionsHandler(config)
+
+
+@pytest.fixture
+def spawn():
+    """
+    Start the worker processes with spawn, which doesn't inherit the modules of the current process.
+    """
+    start_method = multiprocessing.get_start_method()
+    multiprocessing.set_start_method("spawn", force=True)
+    yield
+    multiprocessing.set_start_method(start_method, force=True)
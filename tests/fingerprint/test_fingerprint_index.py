@@ -0,0 +1,151 @@
+import datetime
+from decimal import Decimal
+
+from ledger_importer.fingerprint import FingerprintIndex
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+from ledger_importer.transactions_handler import TransactionsHandler
+
+
+def make_transaction(day, quantity):
+    return Transaction(
+        date=datetime.datetime(year=2021, month=1, day=day),
+        payee="Description",
+        postings=[
+            Posting(account="Assets:Checking", amount=Amount(quantity=Decimal(quantity), commodity="€")),
+            Posting(account="Expenses", amount=Amount(quantity=-Decimal(quantity), commodity="€")),
+        ],
+    )
+
+
+def test_index_contains_journal_transactions(tmp_path):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text(make_transaction(1, "-150").to_ledger())
+
+    index = FingerprintIndex.load(journal_path)
+
+    assert make_transaction(1, "-150.00") in index
+    assert make_transaction(2, "-150") not in index
+    assert FingerprintIndex.index_path(journal_path).exists()
+
+
+def test_index_is_updated_with_appended_transactions(tmp_path):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text(make_transaction(1, "-150").to_ledger())
+    FingerprintIndex.load(journal_path)
+
+    with journal_path.open("a") as journal_file:
+        journal_file.write(make_transaction(2, "-150").to_ledger())
+    index = FingerprintIndex.load(journal_path)
+
+    assert len(index) == 2
+    assert make_transaction(1, "-150") in index
+    assert make_transaction(2, "-150") in index
+
+
+def test_index_is_rebuilt_when_journal_is_rewritten(tmp_path):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text(make_transaction(1, "-150").to_ledger())
+    FingerprintIndex.load(journal_path)
+
+    journal_path.write_text(make_transaction(2, "-150").to_ledger() + make_transaction(3, "-150").to_ledger())
+    index = FingerprintIndex.load(journal_path)
+
+    assert make_transaction(1, "-150") not in index
+    assert make_transaction(2, "-150") in index
+
+
+def test_index_contains_included_transactions(tmp_path):
+    (tmp_path / "2021").mkdir()
+    (tmp_path / "2021" / "january.ledger").write_text(make_transaction(1, "-150").to_ledger())
+    (tmp_path / "2021" / "february.ledger").write_text(
+        "include january.ledger\n" + make_transaction(2, "-150").to_ledger()
+    )
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text("include 2021/*.ledger\n" + make_transaction(3, "-150").to_ledger())
+
+    index = FingerprintIndex.load(journal_path)
+
+    assert len(index) == 3
+    assert all(make_transaction(day, "-150") in index for day in (1, 2, 3))
+
+
+def test_index_is_updated_with_transactions_appended_to_included_files(tmp_path):
+    included_path = tmp_path / "2021.ledger"
+    included_path.write_text(make_transaction(1, "-150").to_ledger())
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text("include 2021.ledger\n")
+    FingerprintIndex.load(journal_path)
+
+    with included_path.open("a") as included_file:
+        included_file.write(make_transaction(2, "-150").to_ledger())
+    with journal_path.open("a") as journal_file:
+        journal_file.write("include 2022.ledger\n")
+    (tmp_path / "2022.ledger").write_text(make_transaction(3, "-150").to_ledger())
+    index = FingerprintIndex.load(journal_path)
+
+    assert len(index) == 3
+    assert all(make_transaction(day, "-150") in index for day in (1, 2, 3))
+    assert sorted(index.header["files"]) == [str(included_path), str(tmp_path / "2022.ledger"), str(journal_path)]
+
+
+def test_index_is_rebuilt_when_an_included_file_is_rewritten(tmp_path):
+    included_path = tmp_path / "2021.ledger"
+    included_path.write_text(make_transaction(1, "-150").to_ledger())
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text("include 2021.ledger\n" + make_transaction(3, "-150").to_ledger())
+    FingerprintIndex.load(journal_path)
+
+    included_path.write_text(make_transaction(2, "-150").to_ledger())
+    index = FingerprintIndex.load(journal_path)
+
+    assert len(index) == 2
+    assert make_transaction(1, "-150") not in index
+    assert make_transaction(2, "-150") in index
+
+
+def test_missing_included_file_is_skipped(tmp_path, capsys):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text("include missing.ledger\n" + make_transaction(1, "-150").to_ledger())
+
+    index = FingerprintIndex.load(journal_path)
+
+    assert len(index) == 1
+    assert "Can't read transactions from" in capsys.readouterr().err
+
+
+def test_known_transactions_are_skipped(config):
+    config.skip_lines = 0
+    handler = TransactionsHandler(config, known_transactions=FingerprintIndex([]))
+    handler.known_transactions.add(handler.row_to_transaction(("01-01-2021", "Description", "-150")))
+
+    transactions = handler.merge_transactions(
+        handler.parse_transactions(iter([("01-01-2021", "Description", "-150"), ("01-02-2021", "Description", "-150")]))
+    )
+
+    assert len(transactions) == 1
+    assert transactions[0].date == datetime.datetime(year=2021, month=1, day=2)
+
+
+def test_each_known_transaction_skips_a_single_identical_transaction(config):
+    config.skip_lines = 0
+    handler = TransactionsHandler(config, known_transactions=FingerprintIndex([]))
+    handler.known_transactions.add(handler.row_to_transaction(("01-01-2021", "Coffee", "-2")))
+
+    transactions = handler.merge_transactions(
+        handler.parse_transactions(iter([("01-01-2021", "Coffee", "-2"), ("01-01-2021", "Coffee", "-2")]))
+    )
+
+    assert len(transactions) == 1
+
+
+def test_index_counts_identical_transactions(tmp_path):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text(make_transaction(1, "-150").to_ledger() * 2)
+    FingerprintIndex.load(journal_path)
+
+    index = FingerprintIndex.load(journal_path)
+
+    assert len(index) == 2
+    assert list(index.skip_known([make_transaction(1, "-150")] * 3)) == [make_transaction(1, "-150")]
@@ -0,0 +1,90 @@
+import datetime
+from decimal import Decimal
+
+from ledger_importer.guesser import TOP_ACCOUNTS
+from ledger_importer.guesser import AccountGuesser
+from ledger_importer.guesser import payee_tokens
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+from ledger_importer.transactions_handler import TransactionsHandler
+
+
+def make_transaction(payee, account):
+    return Transaction(
+        date=datetime.datetime(year=2021, month=1, day=23),
+        payee=payee,
+        postings=[
+            Posting(account="Assets:Checking", amount=Amount(quantity=Decimal("-15"), commodity="€")),
+            Posting(account=account, amount=Amount(quantity=Decimal("15"), commodity="€")),
+        ],
+    )
+
+
+def test_payee_tokens():
+    assert payee_tokens("CARD 27/07/21 SWILE XX*1234 Swile") == ["card", "swile"]
+
+
+def test_guess_most_used_account():
+    guesser = AccountGuesser()
+    guesser.add(make_transaction("CARD 27/07/21 SUPERMARKET", "Expenses:Groceries"))
+    guesser.add(make_transaction("CARD 28/07/21 SUPERMARKET", "Expenses:Groceries"))
+    guesser.add(make_transaction("CARD 29/07/21 RESTAURANT", "Expenses:Restaurant"))
+
+    assert guesser.guess("CARD 01/08/21 SUPERMARKET") == "Expenses:Groceries"
+    assert guesser.guess("CARD 01/08/21 RESTAURANT") == "Expenses:Restaurant"
+    assert guesser.guess("VIR 01/08/21") is None
+
+
+def test_guesser_keeps_the_most_used_accounts_of_each_token():
+    guesser = AccountGuesser()
+    for i in range(100):
+        guesser.add(make_transaction("SUPERMARKET", f"Expenses:Account{i * 7 % 10}"))
+        guesser.add(make_transaction("SUPERMARKET", f"Expenses:Account{i % 3}"))
+
+    counts = guesser.accounts["supermarket"]
+    expected_top = sorted(counts.values(), reverse=True)[:TOP_ACCOUNTS]
+    assert guesser.totals["supermarket"] == 200
+    assert [counts[account] for account in guesser.top_accounts["supermarket"]] == expected_top
+    assert AccountGuesser.loads(guesser.dumps()).top_accounts == {
+        "supermarket": [account for account, _ in counts.most_common(TOP_ACCOUNTS)]
+    }
+    assert guesser.guess("SUPERMARKET") == guesser.top_accounts["supermarket"][0]
+
+
+def test_guesser_learns_from_journal(tmp_path):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text(make_transaction("NETFLIX.COM", "Expenses:Subscriptions").to_ledger())
+    AccountGuesser.load(journal_path)
+
+    with journal_path.open("a") as journal_file:
+        journal_file.write(make_transaction("SPOTIFY", "Expenses:Music").to_ledger())
+    guesser = AccountGuesser.load(journal_path)
+
+    assert guesser.guess("NETFLIX.COM 0123") == "Expenses:Subscriptions"
+    assert guesser.guess("SPOTIFY") == "Expenses:Music"
+
+
+def test_handler_fills_guessed_accounts(config):
+    config.skip_lines = 0
+    guesser = AccountGuesser()
+    guesser.add(make_transaction("Supermarket", "Expenses:Groceries"))
+
+    transactions = TransactionsHandler(config, guesser=guesser).parse_transactions(
+        iter([("01-23-2021", "Supermarket", "-15"), ("01-24-2021", "Cinema", "-10")])
+    )
+
+    assert [transaction.postings[1].account for transaction in transactions] == ["Expenses:Groceries", "Expenses"]
+
+
+def test_handler_keeps_the_accounts_chosen_by_the_config(config):
+    config.skip_lines = 0
+    config.unknown_accounts = ("Expenses:Unknown",)
+    guesser = AccountGuesser()
+    guesser.add(make_transaction("Supermarket", "Expenses:Groceries"))
+
+    transactions = TransactionsHandler(config, guesser=guesser).parse_transactions(
+        iter([("01-23-2021", "Supermarket", "-15")])
+    )
+
+    assert transactions[0].postings[1].account == "Expenses"
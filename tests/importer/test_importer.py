@@ -0,0 +1,61 @@
+import pytest
+
+from ledger_importer.importer import Importer
+
+
+@pytest.fixture
+def statement_path(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text("date,payee,amount\n05-20-2021,Salary,2000\n05-23-2021,Groceries,-42.5\n")
+    yield path
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    path = tmp_path / "journal.ledger"
+    path.write_text("account Assets:Checking\naccount Expenses:Groceries\n")
+    yield path
+
+
+def test_import_statements_returns_the_ledger_text(config, statement_path):
+    text = Importer(config).import_statements([statement_path])
+
+    assert "2021/05/20    Salary" in text
+    assert "2021/05/23    Groceries" in text
+
+
+def test_appended_transactions_are_skipped_by_the_next_import(config, statement_path, journal_path):
+    importer = Importer(config, journal_path=journal_path, skip_imported=True)
+
+    assert "Salary" in importer.import_statements([statement_path], append=True)
+    assert "Salary" in journal_path.read_text()
+
+    assert importer.import_statements([statement_path], append=True) == ""
+
+
+def test_refresh_follows_the_journal(config, journal_path):
+    importer = Importer(config, journal_path=journal_path)
+    importer.refresh()
+    assert importer.accounts == ["Assets:Checking", "Expenses:Groceries"]
+
+    with journal_path.open("a") as journal_file:
+        journal_file.write("account Expenses:Rent\n")
+    importer.refresh()
+
+    assert importer.accounts == ["Assets:Checking", "Expenses:Groceries", "Expenses:Rent"]
+
+
+def test_failed_import_doesnt_checkpoint_its_statements(config, statement_path, journal_path, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    importer = Importer(config, journal_path=journal_path, checkpoint=True)
+    broken_path = tmp_path / "broken.csv"
+    broken_path.write_text("date,payee,amount\nnot a date,Salary,2000\n")
+    other_path = tmp_path / "other.csv"
+    other_path.write_text("date,payee,amount\n05-25-2021,Rent,-800\n")
+
+    with pytest.raises(ValueError):
+        importer.import_statements([statement_path, broken_path], append=True)
+    assert "Rent" in importer.import_statements([other_path], append=True)
+
+    assert "Salary" in importer.import_statements([statement_path], append=True)
+    assert "Groceries" in journal_path.read_text()
@@ -0,0 +1,43 @@
+import datetime
+from decimal import Decimal
+
+from ledger_importer.journal import iter_journal_transactions
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+
+
+def test_iter_journal_transactions():
+    journal = """
+account Expenses:Groceries  ; comment
+
+2021/01/23    Description
+    Assets:Checking    -150 €
+    Expenses    150 €
+
+2021-02-01 * (42) Shop  ; note
+    ; comment
+    Expenses:Food and drinks  $12.50  ; comment
+    Assets:Cash
+"""
+
+    transactions = list(iter_journal_transactions(journal.split("\n")))
+
+    assert transactions == [
+        Transaction(
+            date=datetime.datetime(year=2021, month=1, day=23),
+            payee="Description",
+            postings=[
+                Posting(account="Assets:Checking", amount=Amount(quantity=Decimal("-150"), commodity="€")),
+                Posting(account="Expenses", amount=Amount(quantity=Decimal("150"), commodity="€")),
+            ],
+        ),
+        Transaction(
+            date=datetime.datetime(year=2021, month=2, day=1),
+            payee="Shop",
+            postings=[
+                Posting(account="Expenses:Food and drinks", amount=Amount(quantity=Decimal("12.50"), commodity="$")),
+                Posting(account="Assets:Cash", amount=Amount(quantity=Decimal("-12.50"), commodity="$")),
+            ],
+        ),
+    ]
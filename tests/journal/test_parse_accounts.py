@@ -0,0 +1,62 @@
+from ledger_importer.journal import load_accounts
+from ledger_importer.journal import parse_accounts
+
+
+def test_parse_accounts():
+    accounts = parse_accounts(
+        """
+account Expenses:Groceries  ; comment
+account Foo
+
+commodity €
+"""
+    )
+
+    assert accounts == ["Expenses:Groceries", "Foo"]
+
+
+def test_parse_accounts_used_in_postings():
+    accounts = parse_accounts(
+        """
+account Assets:Checking
+    note Checking account
+
+2021/01/23    Description
+    Assets:Checking    -150 €
+    (Budget:Food)    150 €
+    Expenses:Food and drinks  ; comment
+
+~ Monthly
+    Expenses:Rent    800 €
+    Assets:Checking
+"""
+    )
+
+    assert accounts == ["Assets:Checking", "Budget:Food", "Expenses:Food and drinks", "Expenses:Rent"]
+
+
+def test_load_accounts_is_cached_until_journal_changes(tmp_path):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text("account Foo\n")
+
+    assert load_accounts(journal_path, cache_directory=tmp_path / "cache") == ["Foo"]
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    journal_path.write_text("account Foo\naccount Bar\n")
+
+    assert load_accounts(journal_path, cache_directory=tmp_path / "cache") == ["Foo", "Bar"]
+
+
+def test_load_accounts_follows_includes(tmp_path):
+    (tmp_path / "accounts").mkdir()
+    (tmp_path / "accounts" / "assets.ledger").write_text("account Assets:Checking\ninclude ../journal.ledger\n")
+    (tmp_path / "accounts" / "expenses.ledger").write_text("account Expenses:Groceries\n")
+    (tmp_path / "2021.ledger").write_text(
+        "2021/01/23    Description\n    Expenses:Rent    800 €\n    Assets:Checking\n"
+    )
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text("include accounts/*.ledger\ninclude 2021.ledger\ninclude missing.ledger\naccount Income\n")
+
+    accounts = load_accounts(journal_path, cache_directory=tmp_path / "cache")
+
+    assert accounts == ["Income", "Assets:Checking", "Expenses:Groceries", "Expenses:Rent"]
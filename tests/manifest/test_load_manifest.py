@@ -0,0 +1,52 @@
+import json
+import pathlib
+
+import pytest
+
+from ledger_importer.manifest import ManifestEntry
+from ledger_importer.manifest import load_manifest
+
+
+def test_paths_are_relative_to_the_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(
+        json.dumps(
+            {
+                "statements": [
+                    {"statement_path": "a.csv", "config_path": "configs/bank_a.py::BankA"},
+                    {"statement_path": "/statements/b.csv", "config_path": "configs/bank_b.py::BankB"},
+                    {"statement_path": "c.csv", "config_path": "configs/bank_a.py::BankA"},
+                ],
+                "match_config_path": "configs/bank_b.py::BankB",
+            }
+        )
+    )
+
+    manifest = load_manifest(manifest_path)
+
+    assert manifest.entries == [
+        ManifestEntry(statement_path=tmp_path / "a.csv", config_path=f"{tmp_path}/configs/bank_a.py::BankA"),
+        ManifestEntry(
+            statement_path=pathlib.Path("/statements/b.csv"), config_path=f"{tmp_path}/configs/bank_b.py::BankB"
+        ),
+        ManifestEntry(statement_path=tmp_path / "c.csv", config_path=f"{tmp_path}/configs/bank_a.py::BankA"),
+    ]
+    assert manifest.config_paths == [f"{tmp_path}/configs/bank_a.py::BankA", f"{tmp_path}/configs/bank_b.py::BankB"]
+    assert manifest.match_config_path == f"{tmp_path}/configs/bank_b.py::BankB"
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "not json",
+        "[]",
+        '{"statements": []}',
+        '{"statements": [{"statement_path": "a.csv"}]}',
+    ],
+)
+def test_invalid_manifest(tmp_path, content):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(content)
+
+    with pytest.raises(ValueError, match="Invalid manifest"):
+        load_manifest(manifest_path)
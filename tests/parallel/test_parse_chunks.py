@@ -0,0 +1,30 @@
+import time
+
+from conftest import MyConfig
+
+from ledger_importer.parallel import parse_chunks
+
+
+def raise_import_error():
+    raise ImportError("config module not found")
+
+
+class UnloadableConfig(MyConfig):
+    def __reduce__(self):
+        return (raise_import_error, ())
+
+
+def test_chunks_read_after_the_pool_broke_are_parsed(capsys):
+    rows = [(f"05-{day % 28 + 1:02}-2021", f"payee {day}", str(day)) for day in range(100)]
+
+    def chunks():
+        for start in range(0, len(rows), 10):
+            yield rows[start : start + 10]
+            if start == 10:
+                # Let the workers fail to load the config before the next chunks are sent
+                time.sleep(1)
+
+    transactions = list(parse_chunks(UnloadableConfig(), chunks(), workers=2))
+
+    assert [transaction.payee for transaction in transactions] == [row[1] for row in rows]
+    assert "parsing in a single process" in capsys.readouterr().err
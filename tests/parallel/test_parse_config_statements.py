@@ -0,0 +1,62 @@
+from ledger_importer.config import load_config_class
+from ledger_importer.parallel import parse_config_statements
+
+CONFIG = """
+import datetime
+
+from ledger_importer import Config
+
+
+class MyConfig(Config):
+    def parse_date(self, fields):
+        return datetime.datetime.strptime(fields[0], "%Y-%m-%d")
+
+    def parse_payee(self, fields):
+        return fields[1]
+
+    def parse_postings(self, fields):
+        return []
+"""
+
+# Config whose file can only be loaded by the main process
+UNLOADABLE_CONFIG = (
+    """
+import multiprocessing
+
+if multiprocessing.parent_process() is not None:
+    raise ImportError("no config in workers")
+"""
+    + CONFIG
+)
+
+
+def test_statements_are_parsed_in_spawned_workers(tmp_path, spawn, capsys):
+    (tmp_path / "config.py").write_text(CONFIG)
+    config = load_config_class(tmp_path / "config.py", "MyConfig")()
+    statement_paths = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    statement_paths[0].write_text("date,payee\n2021-05-20,payee a\n")
+    statement_paths[1].write_text("date,payee\n2021-05-21,payee b\n")
+
+    statements_transactions = parse_config_statements([(config, path) for path in statement_paths], workers=2)
+
+    assert [[transaction.payee for transaction in transactions] for transactions in statements_transactions] == [
+        ["payee a"],
+        ["payee b"],
+    ]
+    assert capsys.readouterr().err == ""
+
+
+def test_statements_are_parsed_in_the_current_process_when_workers_cant_load_their_config(tmp_path, spawn, capsys):
+    (tmp_path / "unloadable_config.py").write_text(UNLOADABLE_CONFIG)
+    config = load_config_class(tmp_path / "unloadable_config.py", "MyConfig")()
+    statement_paths = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    statement_paths[0].write_text("date,payee\n2021-05-20,payee a\n")
+    statement_paths[1].write_text("date,payee\n2021-05-21,payee b\n")
+
+    statements_transactions = parse_config_statements([(config, path) for path in statement_paths], workers=2)
+
+    assert [[transaction.payee for transaction in transactions] for transactions in statements_transactions] == [
+        ["payee a"],
+        ["payee b"],
+    ]
+    assert capsys.readouterr().err.count("parsing it in the current process") == 2
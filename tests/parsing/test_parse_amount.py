@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+import pytest
+
+from ledger_importer.parsing import parse_amount
+from ledger_importer.transaction import Amount
+
+
+@pytest.mark.parametrize(
+    "value,quantity",
+    [
+        ("-42", "-42"),
+        ("1,000.00", "1000.00"),
+        ("-1 234,56 €", "-1234.56"),
+        ("1.234.567,8 €", "1234567.8"),
+        ("(12.50)", "-12.50"),
+        ("12.50-", "-12.50"),
+    ],
+)
+def test_parse_amount(value, quantity):
+    assert parse_amount(value, commodity="€") == Amount(quantity=Decimal(quantity), commodity="€")
+
+
+def test_parse_amount_with_separators():
+    assert parse_amount("1.234", commodity="€", decimal_separator=",") == Amount(
+        quantity=Decimal("1234"), commodity="€"
+    )
+
+
+def test_parse_invalid_amount():
+    with pytest.raises(ValueError):
+        parse_amount("abc", commodity="€")
@@ -0,0 +1,25 @@
+import datetime
+
+import pytest
+
+from ledger_importer.parsing import parse_date
+
+
+@pytest.mark.parametrize(
+    "value,date_format",
+    [
+        ("23/01/2021", "%d/%m/%Y"),
+        ("01-23-2021", "%m-%d-%Y"),
+        ("2021-01-23", "%Y-%m-%d"),
+        ("23/01/21", "%d/%m/%y"),
+        ("23 Jan 2021", "%d %b %Y"),
+    ],
+)
+def test_parse_date(value, date_format):
+    assert parse_date(value, date_format) == datetime.datetime(year=2021, month=1, day=23)
+
+
+@pytest.mark.parametrize("value", ["31/02/2021", "23/01/21", "23/01", "aa/01/2021"])
+def test_parse_invalid_date_raises_like_strptime(value):
+    with pytest.raises(ValueError):
+        parse_date(value, "%d/%m/%Y")
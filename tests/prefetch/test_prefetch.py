@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from ledger_importer.prefetch import prefetch
+
+
+def test_items_are_yielded_in_order():
+    assert list(prefetch(range(100), 8)) == list(range(100))
+
+
+def test_items_are_iterated_in_another_thread():
+    threads = []
+
+    def items():
+        for i in range(3):
+            threads.append(threading.current_thread())
+            yield i
+
+    assert list(prefetch(items(), 1)) == [0, 1, 2]
+    assert threading.current_thread() not in threads
+
+
+def test_errors_are_raised_by_the_consumer():
+    def items():
+        yield 1
+        raise ValueError("broken statement")
+
+    iterator = prefetch(items(), 8)
+
+    assert next(iterator) == 1
+    with pytest.raises(ValueError, match="broken statement"):
+        next(iterator)
+
+
+def test_closing_stops_and_closes_the_items():
+    closed = threading.Event()
+
+    def items():
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            closed.set()
+
+    iterator = prefetch(items(), 2)
+    assert next(iterator) == 0
+    iterator.close()
+
+    assert closed.wait(timeout=5)
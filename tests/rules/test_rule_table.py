@@ -0,0 +1,58 @@
+from decimal import Decimal
+
+from ledger_importer.rules import Rule
+from ledger_importer.rules import RuleTable
+
+RULES = [
+    Rule("NETFLIX", "Expenses:Subscriptions", literal=True),
+    Rule(r"CARD \d+/\d+ LIDL", "Expenses:Groceries"),
+    Rule("lidl", "Expenses:Food", literal=True, ignore_case=True),
+    Rule("AMAZON", "Expenses:Shopping", literal=True, min_amount=Decimal("-50")),
+    Rule("AMAZON", "Expenses:Gifts", literal=True),
+]
+
+
+def test_first_matching_rule_wins():
+    table = RuleTable(RULES)
+
+    assert table.match("CARD 12/01 LIDL PARIS").account == "Expenses:Groceries"
+    assert table.match("Lidl Paris").account == "Expenses:Food"
+    assert table.match("NETFLIX.COM LIDL").account == "Expenses:Subscriptions"
+
+
+def test_rules_are_matched_in_order_not_by_position():
+    table = RuleTable([Rule("BC", "First", literal=True), Rule("ABCD", "Second", literal=True)])
+
+    assert table.match("ABCD").account == "First"
+
+
+def test_overlapping_keywords_are_found():
+    table = RuleTable([Rule("SHE", "She", literal=True), Rule("HERS", "Hers", literal=True)])
+
+    assert table.match("USHERS").account == "She"
+    assert table.match("HERS").account == "Hers"
+
+
+def test_amount_conditions():
+    table = RuleTable(RULES)
+
+    assert table.match("AMAZON EU", Decimal("-20")).account == "Expenses:Shopping"
+    assert table.match("AMAZON EU", Decimal("-200")).account == "Expenses:Gifts"
+    assert table.match("AMAZON EU").account == "Expenses:Gifts"
+
+
+def test_regex_rules_are_searched_after_a_refused_amount():
+    table = RuleTable(
+        [
+            Rule("UBER", "Expenses:Transport", literal=True, max_amount=Decimal("-30")),
+            Rule(r"uber\s+eats", "Expenses:Food", ignore_case=True),
+        ]
+    )
+
+    assert table.match("UBER EATS PARIS", Decimal("-12")).account == "Expenses:Food"
+    assert table.match("UBER   EATS", Decimal("-50")).account == "Expenses:Transport"
+
+
+def test_no_matching_rule():
+    assert RuleTable(RULES).match("SNCF") is None
+    assert RuleTable([]).match("SNCF") is None
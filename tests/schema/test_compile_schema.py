@@ -0,0 +1,89 @@
+import datetime
+from decimal import Decimal
+
+from ledger_importer.config import SchemaConfig
+from ledger_importer.config import compile_row_parser
+from ledger_importer.rules import Rule
+from ledger_importer.schema import ColumnSchema
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+from ledger_importer.transactions_handler import TransactionsHandler
+
+
+class BankConfig(SchemaConfig):
+    schema = ColumnSchema(
+        date=0,
+        date_format="%d/%m/%Y",
+        payee=(1, 2),
+        amount=3,
+        account="Assets:Checking",
+        commodity="€",
+        decimal_separator=",",
+        thousands_separator=".",
+    )
+
+
+class OverridingConfig(BankConfig):
+    def parse_payee(self, fields):
+        return fields[1].title()
+
+
+ROW = ("23/01/2021", "CARD", "SUPERMARKET", "-1.234,56 €")
+
+
+def test_compiled_row_parser():
+    parse_row = compile_row_parser(BankConfig())
+
+    assert parse_row(ROW) == Transaction(
+        date=datetime.datetime(year=2021, month=1, day=23),
+        payee="CARD SUPERMARKET",
+        postings=[
+            Posting(account="Assets:Checking", amount=Amount(quantity=Decimal("-1234.56"), commodity="€")),
+            Posting(account="Expenses", amount=Amount(quantity=Decimal("1234.56"), commodity="€")),
+        ],
+    )
+
+
+def test_schema_methods_match_row_parser():
+    config = BankConfig()
+
+    assert TransactionsHandler(config).row_to_transaction(("24/01/2021", "SALARY", "", "2.000,00")) == Transaction(
+        date=config.parse_date(("24/01/2021",)),
+        payee="SALARY",
+        postings=[
+            Posting(account="Assets:Checking", amount=Amount(quantity=Decimal("2000.00"), commodity="€")),
+            Posting(account="Income", amount=Amount(quantity=Decimal("-2000.00"), commodity="€")),
+        ],
+    )
+
+
+def test_overridden_methods_are_used():
+    config = OverridingConfig()
+
+    transaction = TransactionsHandler(config).row_to_transaction(ROW)
+
+    assert compile_row_parser(config) is None
+    assert transaction.payee == "Card"
+    assert transaction.postings[0].amount.quantity == Decimal("-1234.56")
+
+
+def test_schema_rules_give_the_target_account():
+    class RulesConfig(SchemaConfig):
+        schema = ColumnSchema(
+            date=0,
+            date_format="%d/%m/%Y",
+            payee=(1, 2),
+            amount=3,
+            account="Assets:Checking",
+            commodity="€",
+            decimal_separator=",",
+            thousands_separator=".",
+            rules=[Rule("SUPERMARKET", "Expenses:Groceries", literal=True)],
+        )
+
+    config = RulesConfig()
+
+    assert compile_row_parser(config)(ROW).postings[1].account == "Expenses:Groceries"
+    assert config.parse_postings(ROW)[1].account == "Expenses:Groceries"
+    assert config.parse_postings(("23/01/2021", "CARD", "CINEMA", "-8,00 €"))[1].account == "Expenses"
@@ -0,0 +1,79 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ledger_importer.importer import Importer
+from ledger_importer.server import ImportServer
+
+
+@pytest.fixture
+def server(config):
+    server = ImportServer(0, Importer(config))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def request(server, path, body=None, headers=None):
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json", **(headers or {})}
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers)) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+
+def test_import(server, tmp_path):
+    statement_path = tmp_path / "statement.csv"
+    statement_path.write_text("date,payee,amount\n05-20-2021,Salary,2000\n")
+
+    status, text = request(server, "/import", {"statement_paths": [str(statement_path)]})
+
+    assert status == 200
+    assert "2021/05/20    Salary" in text
+
+
+def test_invalid_import_request(server):
+    status, _ = request(server, "/import", {"statements": []})
+
+    assert status == 400
+
+
+def test_failed_import(server, tmp_path):
+    status, _ = request(server, "/import", {"statement_paths": [str(tmp_path / "missing.csv")]})
+
+    assert status == 422
+
+
+def test_unknown_path(server):
+    assert request(server, "/unknown")[0] == 404
+    assert request(server, "/accounts") == (200, "[]")
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {"Origin": "https://example.com"},
+        {"Host": "attacker.example.com"},
+    ],
+)
+def test_requests_from_web_pages_are_refused(server, tmp_path, headers):
+    statement_path = tmp_path / "statement.csv"
+    statement_path.write_text("date,payee,amount\n05-20-2021,Salary,2000\n")
+
+    assert request(server, "/import", {"statement_paths": [str(statement_path)]}, headers)[0] == 403
+    assert request(server, "/accounts", headers=headers)[0] == 403
+
+
+def test_import_must_be_json(server, tmp_path):
+    status, _ = request(server, "/import", {"statement_paths": []}, {"Content-Type": "text/plain"})
+
+    assert status == 415
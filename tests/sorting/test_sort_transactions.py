@@ -0,0 +1,52 @@
+import datetime
+import random
+from decimal import Decimal
+
+import pytest
+
+from ledger_importer.sorting import sort_transactions
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+
+
+def make_transactions(days):
+    return [
+        Transaction(
+            date=datetime.datetime(year=2021, month=1, day=1) + datetime.timedelta(days=day),
+            payee=f"Payee {index}",
+            postings=[
+                Posting(account="Assets:Checking", amount=Amount(quantity=Decimal(index), commodity="€")),
+                Posting(account="Expenses", amount=Amount(quantity=-Decimal(index), commodity="€")),
+            ],
+        )
+        for index, day in enumerate(days)
+    ]
+
+
+@pytest.mark.parametrize(
+    "days",
+    [
+        [day // 3 for day in range(50)],
+        [day // 3 for day in reversed(range(50))],
+        random.Random(0).choices(range(20), k=50),
+        [],
+    ],
+    ids=["sorted", "reverse-sorted", "shuffled", "empty"],
+)
+@pytest.mark.parametrize("run_size", [7, 1000])
+def test_sort_transactions_is_a_stable_sort(days, run_size):
+    transactions = make_transactions(days)
+
+    sorted_transactions = list(sort_transactions(iter(transactions), run_size=run_size))
+
+    assert sorted_transactions == sorted(transactions, key=lambda transaction: transaction.date)
+
+
+def test_runs_are_spilled_in_several_batches(monkeypatch):
+    monkeypatch.setattr("ledger_importer.sorting.SPILL_BATCH_SIZE", 3)
+    transactions = make_transactions(random.Random(0).choices(range(20), k=50))
+
+    sorted_transactions = list(sort_transactions(iter(transactions), run_size=10))
+
+    assert sorted_transactions == sorted(transactions, key=lambda transaction: transaction.date)
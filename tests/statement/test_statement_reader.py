@@ -0,0 +1,95 @@
+import codecs
+import io
+
+import pytest
+
+from ledger_importer.statement import StatementReader
+from ledger_importer.statement import open_statement
+
+ROWS = [
+    ["date", "payee", "amount"],
+    ["05-20-2021", "Salary", "2000"],
+    ["05-23-2021", "Café\nCrème", "-4,5"],
+    ["05-25-2021", "Rent", "-800"],
+]
+TEXT = 'date,payee,amount\n05-20-2021,Salary,2000\n05-23-2021,"Café\nCrème","-4,5"\n05-25-2021,Rent,-800\n'
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        TEXT.encode("utf-8"),
+        codecs.BOM_UTF8 + TEXT.encode("utf-8"),
+        codecs.BOM_UTF16_LE + TEXT.encode("utf-16-le"),
+        codecs.BOM_UTF16_BE + TEXT.encode("utf-16-be"),
+        TEXT.encode("utf-16-le"),
+        TEXT.encode("cp1252"),
+    ],
+    ids=["utf-8", "utf-8-bom", "utf-16-le-bom", "utf-16-be-bom", "utf-16-le", "cp1252"],
+)
+def test_encoding_is_detected(config, data):
+    assert list(StatementReader(io.BytesIO(data), config)) == ROWS
+
+
+def test_configured_encoding(config):
+    config.csv_encoding = "latin-1"
+
+    assert list(StatementReader(io.BytesIO(TEXT.encode("latin-1")), config)) == ROWS
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-32"])
+def test_configured_encoding_without_byte_order_mark(config, tmp_path, encoding):
+    config.csv_encoding = encoding
+    path = tmp_path / "statement.csv"
+    path.write_bytes(TEXT.encode(f"{encoding}-be"))
+
+    with open_statement(path, config) as reader:
+        assert list(reader) == ROWS
+        checkpoint = reader.checkpoint()
+
+    assert path.read_bytes()[checkpoint.row_start : checkpoint.row_end] == "05-25-2021,Rent,-800\n".encode(
+        f"{encoding}-be"
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_undecodable_bytes_are_replaced_and_counted(config, tmp_path, chunk_size):
+    path = tmp_path / "statement.csv"
+    # 0x81 and 0x8d are undefined in Windows Latin-1
+    path.write_bytes(TEXT.encode("cp1252").replace(b"Salary", b"Sal\x81ary") + b"05-26-2021,Caf\xe9 \x8d,-3\n")
+    with path.open("rb") as statement_file:
+        reader = StatementReader(statement_file, config, chunk_size=chunk_size)
+        rows = list(reader)
+        checkpoint = reader.checkpoint()
+        reader.close()
+
+    assert rows[1] == ["05-20-2021", "Sal\ufffdary", "2000"]
+    assert rows[-1] == ["05-26-2021", "Café \ufffd", "-3"]
+    assert path.read_bytes()[checkpoint.row_start : checkpoint.row_end] == b"05-26-2021,Caf\xe9 \x8d,-3\n"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_chunks_are_split_on_row_boundaries(config, chunk_size):
+    reader = StatementReader(io.BytesIO(TEXT.encode("utf-16-le")), config, chunk_size=chunk_size)
+
+    assert next(reader) == ROWS[0]
+    assert [row for chunk in reader.iter_chunks() for row in chunk] == ROWS[1:]
+
+
+def test_checkpoint_points_to_the_last_row(config, tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_bytes(codecs.BOM_UTF8 + TEXT.encode("utf-8"))
+
+    with open_statement(path, config) as reader:
+        list(reader)
+        checkpoint = reader.checkpoint()
+
+    assert checkpoint.header_end == len(codecs.BOM_UTF8 + b"date,payee,amount\n")
+    assert path.read_bytes()[checkpoint.row_start : checkpoint.row_end] == b"05-25-2021,Rent,-800\n"
+
+
+def test_dialect_is_sniffed(config):
+    config.csv_sniff_dialect = True
+    data = b"date;payee;amount\n05-20-2021;'Salary; May';2000\n05-25-2021;Rent;-800\n"
+
+    assert list(StatementReader(io.BytesIO(data), config))[1] == ["05-20-2021", "Salary; May", "2000"]
@@ -0,0 +1,58 @@
+import io
+import json
+import pickle
+
+from ledger_importer.stats import Stats
+from ledger_importer.stats import TimedConfig
+from ledger_importer.transactions_handler import TransactionsHandler
+
+
+def test_stats_count_rows_transactions_and_hooks(config):
+    config.transactions_match = lambda *_: True
+    stats = Stats()
+    handler = TransactionsHandler(config, stats=stats)
+
+    handler.merge_transactions(
+        handler.parse_transactions(
+            iter(
+                [
+                    ["Date", "Payee", "Amount"],
+                    ["01-01-2022", "Shop", "-10"],
+                    ["01-02-2022", "Transfer", "10"],
+                    ["01-03-2022", "Shop", "-5"],
+                ]
+            )
+        )
+    )
+
+    report = stats.report()
+    assert report["counters"] == {"rows_read": 3, "transactions_parsed": 3, "transactions_merged": 1}
+    assert report["hooks"]["parse_date"]["calls"] == 3
+    assert report["hooks"]["transactions_match"]["calls"] == 1
+
+
+def test_stats_time_stages():
+    stats = Stats()
+
+    with stats.stage("parse"):
+        stats.count("rows_read", 10)
+
+    report = stats.report()
+    assert report["stages"]["parse"] >= 0
+    assert report["rows_per_second"] > 0
+
+
+def test_stats_are_written_as_json():
+    stats = Stats()
+    stats.count("rows_read")
+    output = io.StringIO()
+
+    stats.write_json(output)
+
+    assert json.loads(output.getvalue())["counters"] == {"rows_read": 1}
+
+
+def test_timed_config_is_pickled_as_the_config(config):
+    timed_config = TimedConfig(config, Stats())
+
+    assert type(pickle.loads(pickle.dumps(timed_config))) is type(config)
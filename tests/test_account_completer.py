@@ -1,4 +1,5 @@
-from ledger_importer.__main__ import AccountCompleter
+from ledger_importer.completion import AccountCompleter
+from ledger_importer.completion import Match
 
 
 def test_complete():
@@ -8,3 +9,42 @@ def test_complete():
     assert completer.complete("Ex", 0) == "Expenses:Groceries"
     assert completer.complete("Ex", 1) == "Expenses:Restaurant"
     assert completer.complete("Foo", 0) is None
+
+
+def complete_all(completer, text):
+    completions = []
+    while (completion := completer.complete(text, len(completions))) is not None:
+        completions.append(completion)
+    return completions
+
+
+def test_complete_deduplicates_accounts():
+    completer = AccountCompleter(["Expenses:Restaurant", "Expenses:Groceries", "Expenses:Restaurant"])
+
+    assert complete_all(completer, "Ex") == ["Expenses:Groceries", "Expenses:Restaurant"]
+
+
+def test_complete_by_segment():
+    completer = AccountCompleter(
+        ["Assets:Checking", "Expenses", "Expenses:Food:Groceries", "Expenses:Food:Restaurant", "Expenses:Rent"],
+        by_segment=True,
+    )
+
+    assert complete_all(completer, "") == ["Assets:", "Expenses", "Expenses:"]
+    assert complete_all(completer, "Expenses:") == ["Expenses:Food:", "Expenses:Rent"]
+    assert complete_all(completer, "Expenses:Food:R") == ["Expenses:Food:Restaurant"]
+    assert complete_all(completer, "Income:") == []
+
+
+def test_complete_ignoring_case():
+    completer = AccountCompleter(
+        ["Expenses:Groceries", "Expenses:Restaurant"], by_segment=True, match=Match.ignore_case
+    )
+
+    assert complete_all(completer, "expenses:r") == ["Expenses:Restaurant"]
+
+
+def test_complete_subsequence():
+    completer = AccountCompleter(["Expenses:Groceries", "Expenses:Restaurant"], match=Match.subsequence)
+
+    assert complete_all(completer, "exrest") == ["Expenses:Restaurant"]
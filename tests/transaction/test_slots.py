@@ -0,0 +1,36 @@
+import copy
+import datetime
+import pickle
+from decimal import Decimal
+
+import pytest
+
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+
+
+@pytest.fixture
+def transaction():
+    yield Transaction(
+        date=datetime.datetime(year=2021, month=1, day=23),
+        payee="Description",
+        postings=[
+            Posting(account="".join(["Assets:", "Checking"]), amount=Amount(quantity=Decimal("-150"), commodity="€")),
+            Posting(account="Expenses", amount=Amount(quantity=Decimal("150"), commodity="€")),
+        ],
+    )
+
+
+def test_transactions_have_no_dict(transaction):
+    for obj in (transaction, transaction.postings[0], transaction.postings[0].amount):
+        assert not hasattr(obj, "__dict__")
+
+
+def test_accounts_are_interned(transaction):
+    assert transaction.postings[0].account is Posting(account="Assets:Checking", amount=None).account
+
+
+def test_transactions_can_be_copied(transaction):
+    assert pickle.loads(pickle.dumps(transaction)) == transaction
+    assert copy.deepcopy(transaction) == transaction
@@ -0,0 +1,94 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+
+
+@pytest.fixture
+def mock_input():
+    with mock.patch("builtins.input") as input_:
+        yield input_
+
+
+def make_transaction(day, payee, quantity, account="Expenses"):
+    return Transaction(
+        date=datetime.datetime(year=2021, month=1, day=day),
+        payee=payee,
+        postings=[
+            Posting(account="Assets:Checking", amount=Amount(quantity=Decimal(quantity), commodity="€")),
+            Posting(account=account, amount=Amount(quantity=-Decimal(quantity), commodity="€")),
+        ],
+    )
+
+
+def test_one_answer_confirms_the_whole_group(transactions_handler, mock_input):
+    mock_input.side_effect = ["Expenses:Food", "s"]
+    transactions = [
+        make_transaction(1, "CARD 01/01 SUPERMARKET", "-10"),
+        make_transaction(2, "Cinema", "-8"),
+        make_transaction(3, "CARD 03/01 SUPERMARKET", "-20"),
+    ]
+
+    confirmed_transactions = transactions_handler.confirm_grouped_transactions(transactions)
+
+    assert mock_input.call_count == 2
+    assert [transaction.payee for transaction in confirmed_transactions] == [
+        "CARD 01/01 SUPERMARKET",
+        "CARD 03/01 SUPERMARKET",
+    ]
+    assert {transaction.postings[1].account for transaction in confirmed_transactions} == {"Expenses:Food"}
+
+
+def test_expanded_group_is_confirmed_row_by_row(transactions_handler, mock_input):
+    mock_input.side_effect = ["e", "Expenses:Food", "s"]
+    transactions = [
+        make_transaction(1, "SUPERMARKET", "-10"),
+        make_transaction(2, "SUPERMARKET", "-20"),
+    ]
+
+    confirmed_transactions = transactions_handler.confirm_grouped_transactions(transactions)
+
+    assert len(confirmed_transactions) == 1
+    assert confirmed_transactions[0].postings[1].account == "Expenses:Food"
+
+
+def test_transactions_are_grouped_by_suggested_account_and_direction(transactions_handler):
+    supermarket = make_transaction(1, "SUPERMARKET", "-10")
+
+    assert transactions_handler.group_key(supermarket) == transactions_handler.group_key(
+        make_transaction(2, "supermarket 1234", "-30")
+    )
+    assert transactions_handler.group_key(supermarket) != transactions_handler.group_key(
+        make_transaction(1, "SUPERMARKET", "-10", account="Expenses:Food")
+    )
+    assert transactions_handler.group_key(supermarket) != transactions_handler.group_key(
+        make_transaction(1, "SUPERMARKET", "10")
+    )
+
+
+def test_quit_keeps_the_groups_already_confirmed(transactions_handler, mock_input):
+    mock_input.side_effect = ["", "q"]
+    transactions = [
+        make_transaction(1, "SUPERMARKET", "-10"),
+        make_transaction(2, "Cinema", "-8"),
+        make_transaction(3, "SUPERMARKET", "-20"),
+    ]
+
+    confirmed_transactions = transactions_handler.confirm_grouped_transactions(transactions)
+
+    assert [transaction.date.day for transaction in confirmed_transactions] == [1, 3]
+    assert transactions_handler.interrupted
+
+
+def test_group_prompt_shows_count_and_total(transactions_handler):
+    prompt = transactions_handler.render_group_prompt(
+        [make_transaction(1, "SUPERMARKET", "-10"), make_transaction(5, "SUPERMARKET", "-20.5")]
+    )
+
+    assert "| SUPERMARKET |     2 | -30.5 € | 2021/01/01 - 2021/01/05 |" in prompt
+    assert prompt.endswith("([Expenses]/[q]uit/[s]kip/[e]xpand) ")
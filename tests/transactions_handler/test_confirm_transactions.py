@@ -78,3 +78,19 @@ def test_string_updates_target_account_and_confirms_transaction(transactions_han
 
     assert len(confirmed_transactions) == 1
     assert confirmed_transactions[0].postings[1].account == "Expenses:Foobar"
+
+
+def test_prompt_shows_the_suggested_account(transactions_handler):
+    transaction = Transaction(
+        date=datetime.datetime(year=2021, month=1, day=23),
+        payee="Description",
+        postings=[
+            Posting(account="Assets:Checking", amount=Amount(quantity=Decimal("-150"), commodity="€")),
+            Posting(account="Expenses:Food", amount=Amount(quantity=Decimal("150"), commodity="€")),
+        ],
+    )
+
+    prompt = transactions_handler.render_prompt(transaction)
+
+    assert "| Assets:Checking | 2021/01/23 |" in prompt
+    assert prompt.endswith("To which account did this money go? ([Expenses:Food]/[q]uit/[s]kip) ")
@@ -1,9 +1,14 @@
+import copy
 import datetime
+import random
 from decimal import Decimal
 
+import pytest
+
 from ledger_importer.transaction import Amount
 from ledger_importer.transaction import Posting
 from ledger_importer.transaction import Transaction
+from ledger_importer.transactions_handler import TransactionsHandler
 
 
 def test_merged_transactions_are_deduplicated(transactions_handler):
@@ -58,3 +63,55 @@ def test_nothing_is_done_when_transactions_arent_merged(transactions_handler):
 
     assert len(merged_transactions) == 2
     assert merged_transactions[0].postings[1].account == "Expenses"
+
+
+def reference_merge_transactions(config, transactions):
+    merged_transactions = []
+
+    for transaction in transactions:
+        if transaction.postings[0].amount > 0:
+            for matching_transaction in transactions:
+                if any(matching_transaction is t for t in merged_transactions):
+                    continue
+
+                if matching_transaction.date > transaction.date:
+                    break
+
+                if config.transactions_match(transaction, matching_transaction):
+                    transaction.postings[1].account = matching_transaction.postings[0].account
+                    merged_transactions.append(matching_transaction)
+                    break
+
+    return [transaction for transaction in transactions if not any(transaction is t for t in merged_transactions)]
+
+
+def random_transactions(seed, count):
+    rng = random.Random(seed)
+    transactions = []
+    for _ in range(count):
+        quantity = Decimal(rng.choice(["10", "10.00", "25.5", "150", "999.99"])) * rng.choice([1, -1])
+        commodity = rng.choice(["€", "$"])
+        transactions.append(
+            Transaction(
+                date=datetime.datetime(year=2021, month=1, day=1) + datetime.timedelta(days=rng.randrange(30)),
+                payee="Description",
+                postings=[
+                    Posting(
+                        account=rng.choice(["Assets:Checking", "Assets:Savings", "Liabilities:Card"]),
+                        amount=Amount(quantity=quantity, commodity=commodity),
+                    ),
+                    Posting(account="Expenses", amount=Amount(quantity=-quantity, commodity=commodity)),
+                ],
+            )
+        )
+    return sorted(transactions, key=lambda transaction: transaction.date)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_merge_transactions_is_equivalent_to_reference(config, seed):
+    transactions = random_transactions(seed, 300)
+    expected = reference_merge_transactions(config, copy.deepcopy(transactions))
+
+    merged_transactions = TransactionsHandler(config).merge_transactions(copy.deepcopy(transactions))
+
+    assert merged_transactions == expected
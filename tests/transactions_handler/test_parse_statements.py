@@ -0,0 +1,48 @@
+import pytest
+
+from ledger_importer.transactions_handler import TransactionsHandler
+
+
+@pytest.fixture
+def statement_paths(tmp_path):
+    statements = {
+        "checking.csv": [
+            "date,payee,amount",
+            "05-25-2021,Rent,-800",
+            "05-23-2021,Groceries,-42.5",
+            "05-20-2021,Salary,2000",
+        ],
+        "savings.csv": ["date,payee,amount", "05-21-2021,Transfer,800", "05-25-2021,Interests,1.2"],
+    }
+    paths = []
+    for name, lines in statements.items():
+        path = tmp_path / name
+        path.write_text("\n".join(lines) + "\n")
+        paths.append(path)
+    yield paths
+
+
+def test_parse_statements_merges_statements_chronologically(config, statement_paths):
+    transactions = TransactionsHandler(config).parse_statements(statement_paths)
+
+    assert [transaction.payee for transaction in transactions] == [
+        "Salary",
+        "Transfer",
+        "Groceries",
+        "Rent",
+        "Interests",
+    ]
+
+
+def test_parse_statements_in_workers(config, statement_paths):
+    transactions = TransactionsHandler(config, workers=2).parse_statements(statement_paths)
+
+    assert transactions == TransactionsHandler(config).parse_statements(statement_paths)
+
+
+def test_stream_statements_is_equivalent_to_parse_statements(config, statement_paths):
+    handler = TransactionsHandler(config)
+
+    transactions = list(handler.stream_statements(statement_paths))
+
+    assert transactions == handler.merge_transactions(handler.parse_statements(statement_paths))
@@ -1,8 +1,11 @@
 import datetime
 from decimal import Decimal
 
+from conftest import MyConfig
+
 from ledger_importer.transaction import Amount
 from ledger_importer.transaction import Posting
+from ledger_importer.transactions_handler import TransactionsHandler
 
 
 def test_parses_transactions(transactions_handler):
@@ -33,3 +36,44 @@ def test_skip_lines(transactions_handler):
     transactions = transactions_handler.parse_transactions((el for el in [("date", "payee", "amount")]))
 
     assert len(transactions) == 0
+
+
+def test_parses_transactions_in_workers(config):
+    config.skip_lines = 0
+    rows = [(f"05-{day % 28 + 1:02}-2021", f"payee {day}", str(day)) for day in range(100)]
+
+    transactions = TransactionsHandler(config, workers=2).parse_transactions(iter(rows))
+
+    assert transactions == TransactionsHandler(config).parse_transactions(iter(rows))
+
+
+def test_parses_transactions_in_a_single_process_when_config_cant_be_pickled(transactions_handler):
+    transactions_handler.workers = 2
+    transactions_handler.config.skip_lines = 0
+    transactions_handler.config.parse_date = lambda fields: datetime.datetime.strptime(fields[0], "%m-%d-%Y")
+    transactions_handler.config.parse_payee = lambda fields: fields[1]
+    transactions_handler.config.parse_postings = lambda fields: []
+
+    transactions = transactions_handler.parse_transactions(iter([("05-23-2021", "payee", "-100.42")]))
+
+    assert len(transactions) == 1
+    assert transactions[0].payee == "payee"
+
+
+def raise_import_error():
+    raise ImportError("config module not found")
+
+
+class UnloadableConfig(MyConfig):
+    skip_lines = 0
+
+    def __reduce__(self):
+        return (raise_import_error, ())
+
+
+def test_parses_transactions_in_a_single_process_when_workers_cant_load_config():
+    rows = [(f"05-{day % 28 + 1:02}-2021", f"payee {day}", str(day)) for day in range(100)]
+
+    transactions = TransactionsHandler(UnloadableConfig(), workers=2).parse_transactions(iter(rows))
+
+    assert len(transactions) == 100
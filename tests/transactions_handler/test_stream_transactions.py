@@ -0,0 +1,37 @@
+import datetime
+import itertools
+
+from ledger_importer.transactions_handler import TransactionsHandler
+
+
+def rows(days):
+    for index, day in enumerate(days):
+        date = datetime.date(year=2021, month=1, day=1) + datetime.timedelta(days=day)
+        amount = str((index % 5 + 1) * (1 if index % 2 else -1))
+        yield (date.strftime("%m-%d-%Y"), f"Payee {index}", amount)
+
+
+def test_stream_transactions_is_equivalent_to_merge_transactions(config):
+    config.skip_lines = 0
+    config.transactions_match = lambda transaction1, transaction2: (
+        transaction1.postings[0].amount == transaction2.postings[0].amount.reverse()
+    )
+    config.transactions_match_window = datetime.timedelta(days=400)
+    handler = TransactionsHandler(config)
+    days = [(day * 7) % 30 for day in range(200)]
+
+    expected = handler.merge_transactions(handler.parse_transactions(rows(days)))
+
+    assert list(handler.stream_transactions(rows(days))) == expected
+
+
+def test_iter_merge_transactions_yields_transactions_out_of_the_window(config):
+    config.skip_lines = 0
+    handler = TransactionsHandler(config)
+    transactions = handler.iter_transactions(rows(range(10_000)))
+
+    merged_transactions = handler.iter_merge_transactions(transactions, window=datetime.timedelta(days=3))
+
+    assert len(list(itertools.islice(merged_transactions, 5))) == 5
+    # Only the transactions of the window were read
+    assert len(list(transactions)) > 9_000
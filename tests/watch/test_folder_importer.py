@@ -0,0 +1,93 @@
+import sys
+
+import pytest
+
+from ledger_importer.importer import Importer
+from ledger_importer.watch import FolderImporter
+from ledger_importer.watch import InotifyWatcher
+from ledger_importer.watch import PollingWatcher
+
+
+@pytest.fixture
+def statements_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    directory = tmp_path / "statements"
+    directory.mkdir()
+    yield directory
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    path = tmp_path / "journal.ledger"
+    path.write_text("")
+    yield path
+
+
+def folder_importer(config, statements_directory, journal_path, settle=0.0):
+    importer = Importer(config, journal_path=journal_path, checkpoint=True)
+    return FolderImporter(importer, PollingWatcher(statements_directory, interval=0.01), settle=settle)
+
+
+def test_new_and_grown_statements_are_imported(config, statements_directory, journal_path):
+    watcher = folder_importer(config, statements_directory, journal_path)
+    statement_path = statements_directory / "statement.csv"
+    statement_path.write_text("date,payee,amount\n05-20-2021,Salary,2000\n")
+    (statements_directory / "notes.txt").write_text("05-21-2021,Notes,1\n")
+
+    assert watcher.step() == [statement_path]
+    assert "Salary" in journal_path.read_text()
+
+    with statement_path.open("a") as statement_file:
+        statement_file.write("05-23-2021,Groceries,-42.5\n")
+
+    assert watcher.step() == [statement_path]
+    assert journal_path.read_text().count("Salary") == 1
+    assert "Groceries" in journal_path.read_text()
+    assert "Notes" not in journal_path.read_text()
+
+
+def test_statements_are_imported_once_settled(config, statements_directory, journal_path):
+    watcher = folder_importer(config, statements_directory, journal_path, settle=10.0)
+    statement_path = statements_directory / "statement.csv"
+    statement_path.write_text("date,payee,amount\n05-20-2021,Salary,2000\n")
+    watcher.mark(statement_path, 0.0)
+
+    assert watcher.ready(5.0) == []
+
+    with statement_path.open("a") as statement_file:
+        statement_file.write("05-23-2021,Groc")
+
+    assert watcher.ready(10.0) == []
+    assert watcher.ready(15.0) == []
+    assert watcher.ready(20.0) == [statement_path]
+    assert watcher.pending == {}
+
+
+def test_restart_only_imports_new_rows(config, statements_directory, journal_path):
+    statement_path = statements_directory / "statement.csv"
+    statement_path.write_text("date,payee,amount\n05-20-2021,Salary,2000\n")
+    watcher = folder_importer(config, statements_directory, journal_path)
+    watcher.mark_all(0.0)
+    watcher.step()
+
+    with statement_path.open("a") as statement_file:
+        statement_file.write("05-23-2021,Groceries,-42.5\n")
+    watcher = folder_importer(config, statements_directory, journal_path)
+    watcher.mark_all(0.0)
+    watcher.step()
+
+    assert journal_path.read_text().count("Salary") == 1
+    assert journal_path.read_text().count("Groceries") == 1
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is only available on linux")
+def test_inotify_watcher(statements_directory):
+    watcher = InotifyWatcher(statements_directory)
+    try:
+        assert watcher.changes(0) == set()
+
+        (statements_directory / "statement.csv").write_text("date,payee,amount\n")
+
+        assert watcher.changes(1.0) == {statements_directory / "statement.csv"}
+    finally:
+        watcher.close()
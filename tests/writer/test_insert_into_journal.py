@@ -0,0 +1,105 @@
+import datetime
+import os
+from decimal import Decimal
+
+import pytest
+
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+from ledger_importer.writer import insert_into_journal
+
+JOURNAL = """account Assets:Checking
+
+2021/01/10    Rent
+    Assets:Checking    -800 €
+    Expenses:Rent    800 €
+
+; Monthly
+2021/01/20    Salary
+    Assets:Checking    2000 €
+    Income:Salary    -2000 €
+"""
+
+
+def make_transaction(day, payee):
+    return Transaction(
+        date=datetime.datetime(year=2021, month=1, day=day),
+        payee=payee,
+        postings=[
+            Posting(account="Assets:Checking", amount=Amount(quantity=Decimal("-10"), commodity="€")),
+            Posting(account="Expenses", amount=Amount(quantity=Decimal("10"), commodity="€")),
+        ],
+    )
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    path = tmp_path / "journal.ledger"
+    path.write_text(JOURNAL)
+    yield path
+
+
+def payees(journal_path):
+    return [line.split("    ")[1] for line in journal_path.read_text().splitlines() if line.startswith("2021/")]
+
+
+def test_transactions_are_inserted_at_their_date(journal_path):
+    with insert_into_journal(journal_path) as writer:
+        writer.write_all([make_transaction(1, "Early"), make_transaction(10, "Same day"), make_transaction(25, "Late")])
+
+    assert payees(journal_path) == ["Early", "Rent", "Same day", "Salary", "Late"]
+    assert "2021/01/10    Same day\n    Assets:Checking    -10 €\n    Expenses    10 €\n\n; Monthly\n" in (
+        journal_path.read_text()
+    )
+    assert journal_path.read_text().startswith("account Assets:Checking\n\n2021/01/01    Early\n")
+
+
+def test_insert_after_journal_without_final_newline(journal_path):
+    journal_path.write_text(JOURNAL.rstrip("\n"))
+
+    with insert_into_journal(journal_path) as writer:
+        writer.write(make_transaction(25, "Late"))
+
+    assert "Income:Salary    -2000 €\n2021/01/25    Late\n" in journal_path.read_text()
+
+
+def test_insert_keeps_other_bytes_and_mode(journal_path):
+    journal_path.write_bytes(JOURNAL.encode() + b"; caf\xe9\n")
+    os.chmod(journal_path, 0o640)
+
+    with insert_into_journal(journal_path) as writer:
+        writer.write(make_transaction(15, "Groceries"))
+
+    assert journal_path.read_bytes().endswith(b"; caf\xe9\n")
+    assert b"2021/01/15    Groceries" in journal_path.read_bytes()
+    assert os.stat(journal_path).st_mode & 0o777 == 0o640
+
+
+def test_insert_into_symlinked_journal_keeps_the_symlink(tmp_path, journal_path):
+    link_path = tmp_path / "link.ledger"
+    link_path.symlink_to(journal_path)
+
+    with insert_into_journal(link_path) as writer:
+        writer.write(make_transaction(25, "Late"))
+
+    assert link_path.is_symlink()
+    assert payees(journal_path) == ["Rent", "Salary", "Late"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["journal.ledger", "link.ledger"]
+
+
+def test_interrupted_insert_leaves_journal_untouched(journal_path):
+    with pytest.raises(KeyboardInterrupt):
+        with insert_into_journal(journal_path) as writer:
+            writer.write(make_transaction(15, "Groceries"))
+            raise KeyboardInterrupt
+
+    assert journal_path.read_text() == JOURNAL
+    assert [path.name for path in journal_path.parent.iterdir()] == ["journal.ledger"]
+
+
+def test_aligned_transactions_are_inserted(journal_path):
+    with insert_into_journal(journal_path, align_column=40) as writer:
+        writer.write(make_transaction(15, "Groceries"))
+
+    assert payees(journal_path) == ["Rent", "Groceries", "Salary"]
@@ -0,0 +1,68 @@
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+
+from ledger_importer.transaction import Amount
+from ledger_importer.transaction import Posting
+from ledger_importer.transaction import Transaction
+from ledger_importer.writer import LedgerWriter
+from ledger_importer.writer import append_to_journal
+
+
+@pytest.fixture
+def transaction():
+    yield Transaction(
+        date=datetime.datetime(year=2021, month=1, day=23),
+        payee="Description",
+        postings=[
+            Posting(account="Assets:Checking", amount=Amount(quantity=Decimal("-150"), commodity="€")),
+            Posting(account="Expenses", amount=Amount(quantity=Decimal("150"), commodity="€")),
+        ],
+    )
+
+
+def test_write(transaction):
+    output = io.StringIO()
+
+    LedgerWriter(output).write_all([transaction, transaction])
+
+    assert output.getvalue() == (transaction.to_ledger() + "\n") * 2
+
+
+def test_write_aligned_amounts(transaction):
+    output = io.StringIO()
+
+    LedgerWriter(output, align_column=30).write(transaction)
+
+    assert (
+        output.getvalue()
+        == """2021/01/23    Description
+    Assets:Checking     -150 €
+    Expenses             150 €
+
+"""
+    )
+
+
+def test_append_to_journal(transaction, tmp_path):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text("account Expenses")
+
+    with append_to_journal(journal_path) as writer:
+        writer.write(transaction)
+
+    assert journal_path.read_text() == "account Expenses\n" + transaction.to_ledger() + "\n"
+
+
+def test_interrupted_append_leaves_journal_untouched(transaction, tmp_path):
+    journal_path = tmp_path / "journal.ledger"
+    journal_path.write_text("account Expenses\n")
+
+    with pytest.raises(KeyboardInterrupt):
+        with append_to_journal(journal_path) as writer:
+            writer.write(transaction)
+            raise KeyboardInterrupt()
+
+    assert journal_path.read_text() == "account Expenses\n"